@@ -0,0 +1,28 @@
+# -*- coding=UTF-8 -*-
+"""Shared helpers for benchmarks.
+
+Importing this module makes `wlf` in this repository importable.
+"""
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+
+def clock(name, func, *args, **kwargs):
+    """Call @func and print cost time with @name.
+
+    Returns:
+        tuple: (return value of @func, cost seconds)
+    """
+
+    start_time = time.time()
+    ret = func(*args, **kwargs)
+    cost_time = time.time() - start_time
+    print('{:<24s}{:>10.2f}s'.format(name, cost_time))
+    return ret, cost_time
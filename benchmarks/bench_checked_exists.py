@@ -0,0 +1,86 @@
+# -*- coding=UTF-8 -*-
+"""Benchmark `fileutil.checked_exists` on a local render tree.
+
+Usage: python benchmarks/bench_checked_exists.py [directory count] [files per directory] [latency ms]
+
+Latency is added to every `stat` and `scandir` call to emulate network file system.
+"""
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import multiprocessing.dummy
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from _util import clock
+from wlf import fileutil
+
+
+def listing(root, dir_count, file_count):
+    """Create render tree, return checking list with 10% missing files.  """
+
+    ret = []
+    for i in range(dir_count):
+        dirname = os.path.join(root, 'EP01_sc{:03d}_CH_A'.format(i))
+        os.makedirs(dirname)
+        for frame in range(file_count):
+            filename = os.path.join(dirname, 'EP01_sc{:03d}_CH_A.{:04d}.exr'.format(i, frame))
+            if frame % 10:
+                open(filename, 'w').close()
+            ret.append(filename)
+    return ret
+
+
+def legacy_checked_exists(checking_list):
+    """`checked_exists` before directory listing, one `exists` per file.  """
+
+    def _check(i):
+        if os.path.exists(i):
+            return i
+        return None
+
+    pool = multiprocessing.dummy.Pool()
+    ret = sorted(i for i in pool.map(_check, set(checking_list)) if i)
+    pool.close()
+    pool.join()
+    return ret
+
+
+def with_latency(func, latency):
+    """Wrap file system call @func with @latency seconds round-trip.  """
+
+    def _func(*args, **kwargs):
+        time.sleep(latency)
+        return func(*args, **kwargs)
+    return _func
+
+
+def main():
+    dir_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    file_count = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    latency = float(sys.argv[3]) / 1000 if len(sys.argv) > 3 else 0
+    root = tempfile.mkdtemp()
+    stat, scandir = os.stat, os.scandir
+    try:
+        paths = listing(root, dir_count, file_count)
+        print('{} directories, {} paths, {}s latency'.format(
+            dir_count, len(paths), latency))
+        if latency:
+            os.stat = with_latency(os.stat, latency)
+            os.scandir = with_latency(os.scandir, latency)
+
+        expected, legacy_cost = clock('legacy', legacy_checked_exists, paths)
+        result, cost = clock('checked_exists', fileutil.checked_exists, paths)
+        assert result == expected
+        print('{:<24s}{:>10.1f}x'.format('speedup', legacy_cost / cost))
+    finally:
+        os.stat, os.scandir = stat, scandir
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main()
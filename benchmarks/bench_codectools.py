@@ -0,0 +1,79 @@
+# -*- coding=UTF-8 -*-
+"""Benchmark decoding mixed Chinese and ASCII file names.
+
+Usage: python benchmarks/bench_codectools.py [name count]
+"""
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import locale
+import sys
+import warnings
+
+import six
+
+from _util import clock
+from wlf import codectools
+
+
+def listing(count):
+    """Share listing: 60% ASCII, 30% GBK Chinese, 10% UTF-8 Chinese.  """
+
+    ret = []
+    for i in range(count):
+        kind = i % 10
+        if kind < 6:
+            ret.append('EP01_sc{:03d}_CH_A.{:04d}.exr'.format(
+                i // 100, i % 100).encode('ascii'))
+        elif kind < 9:
+            ret.append('第{}集_镜头{:03d}_角色.{:04d}.exr'.format(
+                i // 1000, i // 100, i % 100).encode('gbk'))
+        else:
+            ret.append('预览_{:04d}.mov'.format(i).encode('utf-8'))
+    return ret
+
+
+def legacy_get_unicode(input_bytes, codecs=('UTF-8', 'GBK')):
+    """`get_unicode` before codec memo.  """
+
+    if isinstance(input_bytes, (six.text_type, int)):
+        return six.text_type(input_bytes)
+
+    try:
+        input_bytes = six.binary_type(input_bytes)
+    except TypeError:
+        return six.text_type(input_bytes)
+
+    try:
+        return input_bytes.decode()
+    except UnicodeDecodeError as ex:
+        for i in tuple(codecs) + (sys.getfilesystemencoding(),
+                                  locale.getdefaultlocale()[1]):
+            try:
+                return six.text_type(input_bytes, i)
+            except UnicodeDecodeError:
+                continue
+        raise ex
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    warnings.simplefilter('ignore', DeprecationWarning)
+    names = listing(count)
+    print('{} names'.format(count))
+
+    expected, legacy_cost = clock(
+        'legacy', lambda: [legacy_get_unicode(i) for i in names])
+    result, cost = clock(
+        'get_unicode', lambda: [codectools.get_unicode(i) for i in names])
+    assert result == expected
+    print('{:<24s}{:>10.1f}x'.format('speedup', legacy_cost / cost))
+    result, cost = clock(
+        'decode_many', codectools.decode_many, names)
+    assert result == expected
+    print('{:<24s}{:>10.1f}x'.format('speedup', legacy_cost / cost))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+# -*- coding=UTF-8 -*-
+"""Benchmark throughput and CPU usage of `fileutil.copy_file`.
+
+Usage: python benchmarks/bench_copy_file.py [file size MB] [directory]
+"""
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import os
+import resource
+import shutil
+import sys
+import tempfile
+
+from _util import clock
+from wlf import fileutil
+
+
+def legacy_copy_file(src, dst):
+    """Buffered copy through user space, as before zero-copy.  """
+
+    with open(src, 'rb') as src_fd, open(dst, 'wb') as dst_fd:
+        shutil.copyfileobj(src_fd, dst_fd, 1024 * 1024)
+    shutil.copystat(src, dst)
+
+
+def _copy(name, func, src, dst):
+    size = os.path.getsize(src)
+    start_usage = resource.getrusage(resource.RUSAGE_SELF)
+    _, cost_time = clock(name, func, src, dst)
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    cpu_time = (usage.ru_utime - start_usage.ru_utime
+                + usage.ru_stime - start_usage.ru_stime)
+    print('{:<24s}{:>10.0f}MB/s{:>10.2f}s cpu'.format(
+        '', size / cost_time / 1024 / 1024, cpu_time))
+    os.remove(dst)
+    return cost_time
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 2048
+    root = tempfile.mkdtemp(dir=sys.argv[2] if len(sys.argv) > 2 else None)
+    try:
+        src = os.path.join(root, 'EP01_sc001_v1.mov')
+        block = os.urandom(1024 * 1024)
+        with open(src, 'wb') as f:
+            for _ in range(size):
+                f.write(block)
+        dst = os.path.join(root, 'EP01_sc001_v1.copy.mov')
+        print('{}MB file: {}'.format(size, src))
+
+        legacy_cost = _copy('buffered', legacy_copy_file, src, dst)
+        cost = _copy('copy_file', fileutil.copy_file, src, dst)
+        print('{:<24s}{:>10.1f}x'.format('speedup', legacy_cost / cost))
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main()
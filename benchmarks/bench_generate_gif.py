@@ -0,0 +1,57 @@
+# -*- coding=UTF-8 -*-
+"""Benchmark single pass and two pass palette `ffmpeg.generate_gif`.
+
+Source is a 1080p dailies like clip generated by ffmpeg `testsrc2`.
+
+Usage: python benchmarks/bench_generate_gif.py [duration seconds] [directory]
+"""
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import distutils.spawn
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from _util import clock
+from wlf import ffmpeg
+
+
+def _make_source(filename, duration):
+    subprocess.check_call([
+        'ffmpeg', '-hide_banner', '-loglevel', 'error', '-y',
+        '-f', 'lavfi', '-i', 'testsrc2=size=1920x1080:rate=24:duration={}'.format(duration),
+        '-vcodec', 'libx264', '-pix_fmt', 'yuv420p', '-crf', '18', filename])
+
+
+def _generate(name, src, dst, single_pass):
+    _, cost_time = clock(name, ffmpeg.generate_gif, src, dst,
+                         width=480, single_pass=single_pass)
+    os.remove(dst)
+    return cost_time
+
+
+def main():
+    if not distutils.spawn.find_executable('ffmpeg'):
+        print('ffmpeg not installed')
+        return
+    duration = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    root = tempfile.mkdtemp(dir=sys.argv[2] if len(sys.argv) > 2 else None)
+    try:
+        src = os.path.join(root, 'EP01_sc001_v1.mov')
+        dst = os.path.join(root, 'EP01_sc001_v1.gif')
+        _make_source(src, duration)
+        print('{}s 1080p source: {}'.format(duration, src))
+
+        legacy_cost = _generate('two pass', src, dst, False)
+        cost = _generate('single pass', src, dst, True)
+        print('{:<24s}{:>10.1f}x'.format('speedup', legacy_cost / cost))
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main()
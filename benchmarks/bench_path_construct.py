@@ -0,0 +1,53 @@
+# -*- coding=UTF-8 -*-
+"""Benchmark `PurePath` construction from repeated strings.
+
+Usage: python benchmarks/bench_path_construct.py [path count] [unique count]
+"""
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import sys
+
+from _util import clock
+from wlf import path
+
+
+def listing(count, unique):
+    """Synthetic listing that each path repeats `count / unique` times.  """
+
+    return ['Z:/EP01/Comp/EP01_sc{:04d}_v{}.nk'.format(i % unique // 10, i % 10)
+            for i in range(count)]
+
+
+def _build(factory, paths):
+    for i in paths:
+        factory(i)
+
+
+def _build_and_read(factory, paths):
+    for i in paths:
+        factory(i).version  # pylint: disable=expression-not-assigned
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    unique = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    paths = listing(count, unique)
+    print('{} paths, {} unique'.format(count, unique))
+
+    factories = (('PurePath()', path.PurePath),
+                 ('PurePath.from_str()', path.PurePath.from_str),
+                 ('PurePath.interned()', path.PurePath.interned))
+    for func in (_build, _build_and_read):
+        print('# {}'.format(func.__name__.strip('_').replace('_', ' ')))
+        base_cost = None
+        for name, factory in factories:
+            path.PATH_POOL.clear()
+            _, cost = clock(name, func, factory, paths)
+            base_cost = base_cost or cost
+            print('{:<24s}{:>10.1f}x'.format('speedup', base_cost / cost))
+
+
+if __name__ == '__main__':
+    main()
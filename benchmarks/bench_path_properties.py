@@ -0,0 +1,61 @@
+# -*- coding=UTF-8 -*-
+"""Benchmark repeated footage property access on `PurePath`.
+
+Usage: python benchmarks/bench_path_properties.py [path count]
+"""
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import logging
+import sys
+
+from _util import clock
+from wlf import path
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+PROPERTIES = ('shot', 'version', 'tag', 'layer', 'footage_name')
+
+
+def listing(count):
+    """Synthetic versioned render listing.  """
+
+    return ['Z:/EP01/Render/EP01_sc{0:03d}_CH_A/EP01_sc{0:03d}_v{1}.{2:04d}.exr'.format(
+        i // 1000, i // 100 % 10, i % 100) for i in range(count)]
+
+
+def _access(paths, repeat):
+    for item in paths:
+        for _ in range(repeat):
+            for name in PROPERTIES:
+                getattr(item, name)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    repeat = 5
+    logging.disable(logging.WARNING)
+    names = listing(count)
+    print('{} paths, {} properties, {} times'.format(
+        count, len(PROPERTIES), repeat))
+
+    paths = [path.PurePath(i) for i in names]
+    _, first_cost = clock('first access', _access, paths, 1)
+    _, repeat_cost = clock('repeated access', _access, paths, repeat)
+    if tracemalloc:
+        tracemalloc.start()
+        paths = [path.PurePath(i) for i in names]
+        _access(paths, 1)
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print('{:<24s}{:>10.0f}B'.format('memory per path', size / count))
+    print('repeated access is x{:.1f} faster than first access'.format(
+        first_cost * repeat / repeat_cost))
+
+
+if __name__ == '__main__':
+    main()
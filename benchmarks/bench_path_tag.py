@@ -0,0 +1,80 @@
+# -*- coding=UTF-8 -*-
+"""Benchmark footage tag resolving on a synthetic render listing.
+
+Usage: python benchmarks/bench_path_tag.py [path count]
+"""
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import logging
+import re
+import string
+import sys
+
+from _util import clock
+from wlf import path
+
+
+def listing(count):
+    """Synthetic render listing, 100 frames for each layer.  """
+
+    tags = ('BG_co', 'CH_A', 'CH_B_OC', 'CH_B_ID', 'fog', 'CH_C_SH')
+    ret = []
+    for i in range(count):
+        shot, frame = divmod(i, 100)
+        footage = 'EP01_sc{:03d}_{}'.format(
+            shot // len(tags), tags[shot % len(tags)])
+        ret.append('Z:/EP01/Render/{0}/{0}.{1:04d}.exr'.format(
+            footage, frame))
+    return ret
+
+
+def legacy_tag(filename):
+    """Tag resolving before `TagResolver`.  """
+
+    item = path.PurePath(filename)
+    ret = None
+    for testing_pat in (path.TAG_PATTERN, path.TAG_PATTERN):
+        tag_pat = re.compile(testing_pat, flags=re.I)
+        for test_string in (item.parent.name, item.name):
+            match = re.match(tag_pat, test_string)
+            if match and match.group(1):
+                ret = match.group(1).strip('_').upper()
+                if not any(ret.startswith(i) for i in path.REGULAR_TAGS):
+                    path.LOGGER.warning('不规范标签: %s: %s', ret, item)
+                break
+        if ret:
+            break
+    else:
+        ret = path.DEFAULT_TAG
+
+    if ret in path.TAG_CONVERT_DICT:
+        ret = path.TAG_CONVERT_DICT[ret]
+    else:
+        ret = '_'.join(ret.split('_')[:2])
+        ret = path.TAG_CONVERT_DICT.get(ret, ret)
+
+    if ret.startswith(tuple(string.digits)):
+        ret = '_{}'.format(ret)
+    return path.get_unicode(ret)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    logging.disable(logging.WARNING)
+    paths = listing(count)
+    print('{} paths'.format(count))
+
+    expected, legacy_cost = clock(
+        'legacy', lambda: [legacy_tag(i) for i in paths])
+    result, cost = clock('resolve_tags', path.resolve_tags, paths)
+    assert result == expected
+    _, property_cost = clock(
+        'PurePath.tag', lambda: [path.PurePath(i).tag for i in paths])
+    print('speedup: resolve_tags x{:.1f}, PurePath.tag x{:.1f}'.format(
+        legacy_cost / cost, legacy_cost / property_cost))
+
+
+if __name__ == '__main__':
+    main()
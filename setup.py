@@ -12,6 +12,9 @@ REQUIRES = [
     'psutil~=5.4.3',
     'qt.py~=1.1.0',
     "pathlib2~=2.3.0;python_version<'3'",
+    "backports.functools_lru_cache~=1.5;python_version<'3'",
+    "scandir~=1.9;python_version<'3.5'",
+    "futures~=3.2;python_version<'3'",
     "six~=1.12.0"
 ]
 
@@ -0,0 +1,30 @@
+# -*- coding=UTF-8 -*-
+"""Test `checksum` module.  """
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import hashlib
+
+from wlf import checksum
+
+
+def test_hash_cache(tmpdir, monkeypatch):
+    paths = []
+    for i in range(5):
+        item = tmpdir.join('sc_001.{:04d}.exr'.format(i))
+        item.write_binary(b'a' * i)
+        paths.append(str(item))
+    filename = str(tmpdir.join('hash.db'))
+    with checksum.HashCache(filename, workers=2) as cache:
+        assert dict(cache.hash_many(paths)) == {
+            i: hashlib.sha1(b'a' * n).hexdigest() for n, i in enumerate(paths)}
+
+    read = []
+    digest = checksum.digest
+    monkeypatch.setattr(checksum, 'digest', lambda *args: read.append(args) or digest(*args))
+    tmpdir.join('sc_001.0001.exr').write_binary(b'b')
+    with checksum.HashCache(filename) as cache:
+        assert cache.hash(paths[1]) == hashlib.sha1(b'b').hexdigest()
+        assert cache.hash(paths[2]) == hashlib.sha1(b'aa').hexdigest()
+    assert [i[0] for i in read] == [paths[1]]
@@ -10,3 +10,35 @@ def test_get_unicode():
     assert codectools.get_unicode(b'aaaa') == 'aaaa'
     assert codectools.get_unicode(u'测试'.encode('utf-8')) == u'测试'
     assert codectools.get_unicode(u'测试'.encode('gbk')) == u'测试'
+
+
+def test_get_unicode_source():
+    data = u'测试'.encode('gbk')
+    assert codectools.get_unicode(data, source='share') == u'测试'
+    assert codectools.get_unicode(data, source='share') == u'测试'
+    assert codectools.get_unicode(u'测试'.encode('utf-8'), source='share') == u'测试'
+
+
+def test_get_unicode_permissive():
+    gbk, latin = u'测试'.encode('gbk'), u'\xe9t\xe9'.encode('latin-1')
+    codecs = ('GBK', 'latin-1')
+    assert codectools.get_unicode(latin, codecs) == u'\xe9t\xe9'
+    assert codectools.get_unicode(gbk, codecs) == u'测试'
+    assert codectools.get_unicode(latin, codecs, source='latin') == u'\xe9t\xe9'
+    assert codectools.get_unicode(gbk, codecs, source='latin') == u'测试'
+
+    assert codectools.get_unicode(gbk, codecs, source='gbk') == u'测试'
+    assert codectools.get_unicode(gbk, ('latin-1', 'GBK'), source='gbk') == (
+        gbk.decode('latin-1'))
+
+
+def test_decode_many():
+    items = [b'a', u'测试'.encode('gbk'), u'测试'.encode('utf-8'), u'b', 1]
+    assert codectools.decode_many(items) == ['a', u'测试', u'测试', 'b', '1']
+
+
+def test_decode_path():
+    gbk = u'Z:/测试/a.exr'.encode('gbk')
+    assert codectools.decode_path(gbk) == u'Z:/测试/a.exr'
+    assert codectools._CODEC_MEMO[b'Z:'] == 'gbk'  # pylint: disable=protected-access
+    assert codectools.decode_path(u'测试') == u'测试'
@@ -0,0 +1,94 @@
+# -*- coding=UTF-8 -*-
+"""Test `concurrency` module.  """
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import errno
+import multiprocessing.dummy
+import threading
+import time
+
+import pytest
+
+from wlf import concurrency
+
+
+class FakeClock(object):
+    """Manually advanced clock.  """
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+def _window(controller, clock, latency, count, amounts=(1,)):
+    starts = [controller.acquire() for _ in range(count)]
+    clock.now += latency
+    for index, i in enumerate(starts):
+        controller.release(i, amounts[index % len(amounts)])
+
+
+def test_aimd(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(concurrency, 'time', clock)
+    controller = concurrency.AIMDController(initial=4, maximum=6)
+
+    _window(controller, clock, 0.1, 4)
+    assert controller.limit == 5
+    _window(controller, clock, 0.1, 5)
+    assert controller.limit == 6
+    _window(controller, clock, 0.1, 6)
+    assert controller.limit == 6
+
+    # Latency grows without more throughput.
+    _window(controller, clock, 1, 6)
+    assert controller.limit == 3
+
+    with pytest.raises(OSError):
+        with controller.slot():
+            raise OSError(errno.ETIMEDOUT, 'timeout')
+    assert controller.limit == 1
+    with pytest.raises(OSError):
+        with controller.slot():
+            raise OSError(errno.ENOENT, 'missing')
+    assert controller.limit == 1
+
+
+def test_aimd_throughput(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(concurrency, 'time', clock)
+    controller = concurrency.AIMDController(initial=4, maximum=8, metric='throughput')
+
+    # Mixed amounts with steady throughput keep growing.
+    for limit in range(5, 9):
+        _window(controller, clock, 1, controller.limit, (1, 1000, 10, 100000))
+        assert controller.limit == limit
+
+    _window(controller, clock, 10, controller.limit, (1, 1000, 10, 100000))
+    assert controller.limit == 4
+    with pytest.raises(ValueError):
+        concurrency.AIMDController(metric='unknown')
+
+
+def test_limit():
+    controller = concurrency.AIMDController(initial=2, maximum=4)
+    lock = threading.Lock()
+    state = {'running': 0, 'max': 0}
+
+    @controller.wrap
+    def _run(_):
+        with lock:
+            state['running'] += 1
+            state['max'] = max(state['max'], state['running'])
+        time.sleep(0.001)
+        with lock:
+            state['running'] -= 1
+
+    pool = multiprocessing.dummy.Pool(8)
+    pool.map(_run, range(100))
+    pool.close()
+    pool.join()
+    assert 1 < state['max'] <= 4
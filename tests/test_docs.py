@@ -20,3 +20,11 @@ class DocstringTestCase(TestCase):
     def test_fileutil(self):
         from wlf import fileutil
         self._test_mod(fileutil)
+
+    def test_sequence(self):
+        from wlf import sequence
+        self._test_mod(sequence)
+
+    def test_frameset(self):
+        from wlf import frameset
+        self._test_mod(frameset)
@@ -5,6 +5,9 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
 import distutils
+import json
+import pickle
+import tracemalloc
 
 import pytest
 import six
@@ -15,8 +18,8 @@ from wlf import ffmpeg
 TEST_FILES = [util.path('resource', 'gray.jpg'),
               util.path('resource', 'gray.png')]
 
-pytestmark = [pytest.mark.skipif(not distutils.spawn.find_executable(
-    'ffmpeg'), reason='ffmpeg not installed')]
+requires_ffmpeg = pytest.mark.skipif(not distutils.spawn.find_executable(
+    'ffmpeg'), reason='ffmpeg not installed')
 
 
 def _test_method(method, tmpdir):
@@ -27,14 +30,17 @@ def _test_method(method, tmpdir):
         assert result.exists()
 
 
+@requires_ffmpeg
 def test_generate_jpg(tmpdir):
     _test_method(ffmpeg.generate_jpg, tmpdir)
 
 
+@requires_ffmpeg
 def test_generate_gif(tmpdir):
     _test_method(ffmpeg.generate_gif, tmpdir)
 
 
+@requires_ffmpeg
 def test_generate_mp4(tmpdir):
     _test_method(ffmpeg.generate_mp4, tmpdir)
 
@@ -50,6 +56,186 @@ def test_parse_div():
         assert method(k) == v
 
 
+@requires_ffmpeg
 def test_probe():
     for i in TEST_FILES:
         ffmpeg.probe(i)
+
+
+def test_probe_cache(tmpdir, monkeypatch):
+    calls = []
+
+    def _probe(filename):
+        calls.append(filename)
+        ret = ffmpeg.ProbeResult({'format': {'duration': '2.0'}, 'streams': []})
+        ret.error = ''
+        return ret
+    monkeypatch.setattr(ffmpeg, '_probe', _probe)
+    media = [tmpdir.join('{}.mov'.format(i)) for i in range(3)]
+    for i in media:
+        i.write('a')
+    filename = str(tmpdir.join('probe.db'))
+
+    cache = ffmpeg.ProbeCache(filename, maxsize=2, memory_maxsize=1)
+    for i in media:
+        assert ffmpeg.probe(i, cache=cache).duration() == 2.0
+    assert len(calls) == 3
+    ffmpeg.probe(media[2], cache=cache)  # From memory.
+    ffmpeg.probe(media[1], cache=cache)  # From disk.
+    assert len(calls) == 3
+    ffmpeg.probe(media[0], cache=cache)  # Evicted.
+    assert len(calls) == 4
+
+    cache = ffmpeg.ProbeCache(filename)
+    ffmpeg.probe(media[1], cache=cache)
+    assert len(calls) == 4
+    ffmpeg.probe(media[2], cache=cache)  # Evicted.
+    assert len(calls) == 5
+    media[1].write('changed')
+    ffmpeg.probe(media[1], cache=cache)
+    assert len(calls) == 6
+
+
+def test_probe_cache_fallback(tmpdir, monkeypatch):
+    calls = []
+
+    def _probe(filename):
+        calls.append(filename)
+        ret = ffmpeg.ProbeResult({'format': {'duration': '2.0'}, 'streams': []})
+        ret.error = 'Invalid data found when processing input' if len(calls) == 1 else ''
+        return ret
+    monkeypatch.setattr(ffmpeg, '_probe', _probe)
+    media = tmpdir.join('a.mov')
+    media.write('a')
+
+    cache = ffmpeg.ProbeCache(str(tmpdir.join('missing', 'probe.db')))
+    assert ffmpeg.probe(media, cache=cache).error
+    assert not ffmpeg.probe(media, cache=cache).error
+    assert ffmpeg.probe(media, cache=cache).duration() == 2.0
+    assert len(calls) == 2
+    assert cache.filename is None
+
+    cache.put(cache.key(media), ffmpeg.ProbeResult())
+    assert cache.get(cache.key(media))
+
+    result = cache.get(cache.key(media))
+    result['format']['duration'] = '4.0'
+    assert cache.get(cache.key(media)).duration() == 2.0
+
+
+def test_probe_many(tmpdir, monkeypatch):
+    def _run_ffprobe(filename):
+        if 'broken' in six.text_type(filename):
+            raise ValueError('No JSON object could be decoded')
+        return ffmpeg.ProbeResult({'format': {'duration': '2.0'}, 'streams': []})
+    monkeypatch.setattr(ffmpeg, '_run_ffprobe', _run_ffprobe)
+    paths = [str(tmpdir.join('{}.mov'.format(i))) for i in range(20)]
+    paths.append(str(tmpdir.join('broken.mov')))
+
+    results = dict(ffmpeg.probe_many(paths, workers=4, cache=False))
+    assert set(results) == set(paths)
+    broken = results.pop(paths[-1])
+    assert not broken and 'JSON' in broken.error
+    assert all(i.duration() == 2.0 for i in results.values())
+
+
+def test_probe_result():
+    raw = ('{"format":{"duration":"2.0"},"streams":['
+           '{"codec_type":"audio","r_frame_rate":"0/0"},'
+           '{"codec_type":"video","r_frame_rate":"24000/1001","width":1920,'
+           '"height":1080,"codec_name":"h264","pix_fmt":"yuv420p"}]}')
+    result = ffmpeg.ProbeResult.from_json(raw)
+    assert json.loads(json.dumps(result)) == json.loads(raw)
+    assert dict(result) == json.loads(raw)
+    assert result.fps() == 24000 / 1001
+    assert result.frames() == 48
+    assert (result.width, result.height, result.codec, result.pix_fmt) == (
+        1920, 1080, 'h264', 'yuv420p')
+    assert result.raw == raw
+    assert pickle.loads(pickle.dumps(result)) == result
+
+    compact = result.compact()
+    assert compact.frames() == 48
+    assert (compact.width, compact.codec, compact.pix_fmt) == (1920, 'h264', 'yuv420p')
+    assert compact['format'] == {'duration': '2.0'}
+    assert compact.result() == result and compact.result() is not compact.result()
+
+    result['format']['duration'] = '4.0'
+    result['streams'][1]['r_frame_rate'] = '25/1'
+    assert (result.duration(), result.fps()) == (4.0, 25.0)
+    assert compact.duration() == 2.0
+
+    result = ffmpeg.ProbeResult({'format': {}, 'streams': []})
+    assert result.raw == '{"format":{},"streams":[]}'
+    with pytest.raises(KeyError):
+        result.duration()
+    with pytest.raises(ValueError):
+        result.fps()
+    assert not ffmpeg.ProbeResult()
+    assert not ffmpeg.ProbeResult().compact()
+
+
+def _probe_json(index):
+    stream = {'index': 0, 'codec_name': 'h264', 'codec_long_name': 'H.264 / AVC / MPEG-4 AVC',
+              'profile': 'High', 'codec_type': 'video', 'codec_tag_string': 'avc1',
+              'width': 1920, 'height': 1080, 'pix_fmt': 'yuv420p', 'r_frame_rate': '25/1',
+              'avg_frame_rate': '25/1', 'time_base': '1/12800', 'start_time': '0.000000',
+              'duration': '{}.000000'.format(index), 'bit_rate': '5000000',
+              'nb_frames': '{}'.format(index * 25),
+              'disposition': {'default': 1, 'dub': 0, 'original': 0, 'comment': 0},
+              'tags': {'language': 'und', 'handler_name': 'VideoHandler'}}
+    audio = dict(stream, index=1, codec_type='audio', codec_name='aac')
+    return json.dumps({
+        'streams': [stream, audio],
+        'format': {'filename': '/prj/EP01/sc_{:04d}_v1.mov'.format(index),
+                   'nb_streams': 2, 'format_name': 'mov,mp4,m4a,3gp,3g2,mj2',
+                   'duration': '{}.000000'.format(index), 'size': str(index * 1000),
+                   'bit_rate': '5000000', 'tags': {'major_brand': 'qt  '}}})
+
+
+def test_probe_result_memory():
+    texts = [_probe_json(i) for i in range(500)]
+
+    def _size(func):
+        tracemalloc.start()
+        try:
+            items = [func(i) for i in texts]
+            return tracemalloc.get_traced_memory()[0] / len(items)
+        finally:
+            tracemalloc.stop()
+
+    plain = _size(json.loads)
+    assert _size(ffmpeg.ProbeResult.from_json) < plain * 0.6
+    assert _size(lambda i: ffmpeg.ProbeResult.from_json(i).compact()) < plain * 0.2
+
+
+def test_preview_graph():
+    args = ffmpeg._preview_graph([  # pylint: disable=protected-access
+        ('a.jpg', {}), ('a.gif', {'width': 480}), ('a.mp4', {'duration': 2}),
+        ('a_720p.mp4', {'height': 720})], poster_time=1.5)
+    assert args[:2] == [
+        '-filter_complex',
+        '[0:v] split=4 [v0][v1][v2][v3]; '
+        '[v0] trim=start=1.5,setpts=PTS-STARTPTS,'
+        r'scale=-1:min(ih\, 1080):flags=lanczos [o0]; '
+        '[v1] fps=15,scale=480:-1:flags=lanczos,split [a1][b1]; '
+        '[a1] palettegen [p1]; [b1][p1] paletteuse [o1]; '
+        r'[v2] scale=-2:min(trunc(ih / 2) * 2\, 1080):flags=lanczos [o2]; '
+        '[v3] scale=-2:720:flags=lanczos [o3]']
+    assert args[2:9] == ['-map', '[o0]', '-q:v', '1', '-frames:v', '1', 'a.jpg']
+    assert args[9:12] == ['-map', '[o1]', 'a.gif']
+    assert args[12:16] == ['-map', '[o2]', '-map', '0:a?']
+    assert args[args.index('a.mp4') - 2:args.index('a.mp4')] == ['-t', 2]
+    assert args[-1] == 'a_720p.mp4'
+    with pytest.raises(ValueError):
+        ffmpeg._preview_graph([('a.avi', {})])  # pylint: disable=protected-access
+
+
+@requires_ffmpeg
+def test_generate_previews(tmpdir):
+    for index, i in enumerate(TEST_FILES):
+        outputs = [tmpdir.join('{}.{}'.format(index, j)) for j in ('jpg', 'gif', 'mp4')]
+        result = ffmpeg.generate_previews(
+            i, [str(j) for j in outputs] + [(str(tmpdir.join('{}_240p.mp4'.format(index))),
+                                             {'height': 240})])
+        assert all(j.exists() for j in result)
@@ -1,9 +1,16 @@
 # -*- coding=UTF-8 -*-
 """Test `fileutil` module.  """
 
+import errno
+import os
+import re
+import threading
 import time
 
-from wlf import fileutil
+import pytest
+from six.moves import BaseHTTPServer, socketserver
+
+from wlf import fileutil, progress, scan
 
 
 def test_is_same(tmpdir):
@@ -20,3 +27,319 @@ def test_is_same(tmpdir):
     assert fileutil.is_same(file1, file2)
     file2.write('bbbb')
     assert not fileutil.is_same(file1, file2)
+
+
+def test_version_filter(tmpdir):
+    old = tmpdir.join('sc_001_v2.mov')
+    old.write('aaa')
+    old.setmtime(1)
+    new = tmpdir.join('sc_001_v2.mp4')
+    new.write('aaa')
+    paths = (str(i) for i in (tmpdir.join('sc_001_v1.mov'), old, new,
+                              tmpdir.join('SC_002_v1.mov'), tmpdir.join('sc_002.mov'),
+                              tmpdir.join('thumbs.db')))
+    assert fileutil.version_filter(paths) == sorted(
+        [str(new), str(tmpdir.join('SC_002_v1.mov')), str(tmpdir.join('thumbs.db'))])
+
+
+def test_version_filter_records():
+    records = [scan.FootageRecord('sc_001_v2_a.exr', 0, 2, 'sc_001', 2, None),
+               scan.FootageRecord('sc_001_v2_b.exr', 0, 3, 'sc_001', 2, None),
+               scan.FootageRecord('sc_001_v1.exr', 0, 9, 'sc_001', 1, None),
+               scan.FootageRecord('sc_002.exr', 0, 1, 'sc_002', None, None)]
+    assert fileutil.version_filter(records, records=True) == [
+        records[1], records[3]]
+
+
+def test_checked_exists(tmpdir, monkeypatch):
+    existed = [tmpdir.join('a', 'sc_001.{:04d}.exr'.format(i)) for i in range(3)]
+    for i in existed:
+        i.write('', ensure=True)
+    missing = [tmpdir.join('a', 'sc_001.0009.exr'),
+               tmpdir.join('b', 'sc_001.0001.exr'),
+               tmpdir.join('a', 'sc_001.0001.exr', 'c')]
+    checking = [str(i) for i in existed + missing] + [str(tmpdir.join('a')) + '/']
+    handlers = []
+
+    def _handler():
+        handlers.append(progress.handlers.base.BaseProgressHandler())
+        return handlers[-1]
+    monkeypatch.setattr(fileutil.progress_core, 'DefaultHandler', _handler)
+    assert fileutil.checked_exists(checking) == sorted(
+        [str(i) for i in existed] + [str(tmpdir.join('a')) + '/'])
+    assert handlers[0].count == handlers[0].total == len(checking)
+
+
+def test_copy_many(tmpdir):
+    pairs = []
+    for i in range(20):
+        src = tmpdir.join('src', 'sc_001.{:04d}.exr'.format(i))
+        src.write('a' * i, ensure=True)
+        src.setmtime(1000)
+        pairs.append((str(src), str(tmpdir.join('dst', 'sc_001', src.basename))))
+    pairs.append((str(tmpdir.join('src', 'missing.exr')), str(tmpdir.join('dst', 'missing.exr'))))
+    handler = progress.handlers.base.BaseProgressHandler()
+
+    futures = list(fileutil.copy_many(pairs, workers=4, volume_workers=2, handler=handler))
+    assert len(futures) == len(pairs)
+    assert sorted(i.result() for i in futures if not i.exception()) == sorted(
+        i[1] for i in pairs[:-1])
+    assert [i for i in futures if i.exception()][0].exception().errno == errno.ENOENT
+    assert handler.count == handler.total
+    for src, dst in pairs[:-1]:
+        assert fileutil.is_same(src, dst)
+
+
+def test_copy_many_relative(tmpdir):
+    tmpdir.join('src.exr').write('a')
+    with tmpdir.as_cwd():
+        results = fileutil.copy_many([('src.exr', 'dst.exr')])
+        # Started without iteration.
+        for _ in range(100):
+            if fileutil.is_same('src.exr', 'dst.exr'):
+                break
+            time.sleep(0.01)
+        assert fileutil.is_same('src.exr', 'dst.exr')
+        assert [i.result() for i in results] == ['dst.exr']
+
+
+def test_copy_file(tmpdir, monkeypatch):
+    src = tmpdir.join('src.mov')
+    src.write_binary(os.urandom(3 * 1024 * 1024 + 1))
+    src.setmtime(1000)
+    sizes = []
+    fileutil.copy_file(str(src), str(tmpdir.join('dst.mov')), sizes.append)
+    assert tmpdir.join('dst.mov').read_binary() == src.read_binary()
+    assert sum(sizes) == src.size()
+    assert fileutil.is_same(src, tmpdir.join('dst.mov'))
+
+    def _unsupported(*_):
+        raise OSError(errno.EXDEV, os.strerror(errno.EXDEV))
+    monkeypatch.setattr(fileutil, '_ZERO_COPY_FUNCS', [_unsupported])
+    fileutil.copy_file(str(src), str(tmpdir.join('fallback.mov')))
+    assert tmpdir.join('fallback.mov').read_binary() == src.read_binary()
+    assert fileutil.is_same(src, tmpdir.join('fallback.mov'))
+
+
+def test_copy_file_chunks(tmpdir, monkeypatch):
+    src = tmpdir.join('src.mov')
+    src.write_binary(os.urandom(5 * 1024 * 1024 + 3))
+    src.setmtime(1000)
+    sizes = []
+    fileutil.copy_file(str(src), str(tmpdir.join('dst.mov')), sizes.append,
+                       workers=3, chunk_size=1024 * 1024)
+    assert tmpdir.join('dst.mov').read_binary() == src.read_binary()
+    assert sum(sizes) == src.size()
+    assert fileutil.is_same(src, tmpdir.join('dst.mov'))
+
+    monkeypatch.delattr(os, 'pread', raising=False)
+    fileutil.copy_file(str(src), str(tmpdir.join('seek.mov')),
+                       workers=3, chunk_size=1024 * 1024)
+    assert tmpdir.join('seek.mov').read_binary() == src.read_binary()
+    assert fileutil.is_same(src, tmpdir.join('seek.mov'))
+
+
+HTTP_DATA = os.urandom(3 * 1024 * 1024 + 5)
+
+
+class RangeHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Serve `HTTP_DATA` with keep-alive and `Range` support.  """
+
+    protocol_version = 'HTTP/1.1'
+    requests = []
+    etag = '"v1"'
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        self.requests.append((self.path, self.client_address, self.headers.get('Range')))
+        if self.path == '/redirect':
+            self.send_response(302)
+            self.send_header('Location', '/data.bin')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if self.path == '/nolength':
+            self.send_response(200)
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            self.wfile.write(HTTP_DATA)
+            self.close_connection = True
+            return
+        match = re.match(r'bytes=(\d+)-', self.headers.get('Range') or '')
+        if self.headers.get('If-Range') not in (None, self.etag):
+            match = None
+        start = int(match.group(1)) if match else 0
+        if start >= len(HTTP_DATA):
+            self.send_response(416)
+            self.send_header('Content-Range', 'bytes */{}'.format(len(HTTP_DATA)))
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(206 if match else 200)
+        self.send_header('ETag', self.etag)
+        if match:
+            self.send_header('Content-Range', 'bytes {}-{}/{}'.format(
+                start, len(HTTP_DATA) - 1, len(HTTP_DATA)))
+        self.send_header('Content-Length', str(len(HTTP_DATA) - start))
+        self.end_headers()
+        self.wfile.write(HTTP_DATA[start:])
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+class Server(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    """Threading server, so kept alive connections do not block shutdown.  """
+
+    daemon_threads = True
+
+
+@pytest.fixture(name='server')
+def _server():
+    server = Server(('127.0.0.1', 0), RangeHandler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    del RangeHandler.requests[:]
+    yield 'http://127.0.0.1:{}'.format(server.server_address[1])
+    fileutil.HTTP_POOL.clear()
+    server.shutdown()
+    server.server_close()
+
+
+def test_download(tmpdir, server):
+    pool = fileutil.HTTPConnectionPool()
+    handler = progress.handlers.base.BaseProgressHandler()
+    dst = str(tmpdir.join('a.bin'))
+    assert fileutil.download(server + '/data.bin', dst, handler=handler, pool=pool) == dst
+    assert tmpdir.join('a.bin').read_binary() == HTTP_DATA
+    assert handler.count == handler.total == len(HTTP_DATA)
+
+    fileutil.download(server + '/redirect', str(tmpdir.join('b.bin')), pool=pool)
+    assert tmpdir.join('b.bin').read_binary() == HTTP_DATA
+    assert not tmpdir.join('b.bin.part').check()
+    assert len(set(i[1] for i in RangeHandler.requests)) == 1
+    pool.clear()
+
+
+def test_download_no_length(tmpdir, server):
+    handler = progress.handlers.base.BaseProgressHandler()
+    dst = str(tmpdir.join('a.bin'))
+    fileutil.download(server + '/nolength', dst, handler=handler)
+    assert tmpdir.join('a.bin').read_binary() == HTTP_DATA
+    assert handler.total is None
+    assert handler.count == len(HTTP_DATA)
+
+
+def test_download_resume(tmpdir, server):
+    tmpdir.join('a.bin.part').write_binary(HTTP_DATA[:1000])
+    tmpdir.join('a.bin.part.validator').write_binary(b'"v1"')
+    fileutil.download(server + '/data.bin', str(tmpdir.join('a.bin')))
+    assert tmpdir.join('a.bin').read_binary() == HTTP_DATA
+    assert RangeHandler.requests[-1][2] == 'bytes=1000-'
+    assert not tmpdir.join('a.bin.part.validator').check()
+
+    tmpdir.join('b.bin.part').write_binary(HTTP_DATA)
+    tmpdir.join('b.bin.part.validator').write_binary(b'"v1"')
+    fileutil.download(server + '/data.bin', str(tmpdir.join('b.bin')))
+    assert tmpdir.join('b.bin').read_binary() == HTTP_DATA
+
+    # No validator, can not tell part file is from same remote file.
+    tmpdir.join('c.bin.part').write_binary(b'x' * 1000)
+    fileutil.download(server + '/data.bin', str(tmpdir.join('c.bin')))
+    assert tmpdir.join('c.bin').read_binary() == HTTP_DATA
+    assert RangeHandler.requests[-1][2] is None
+
+
+def test_download_resume_changed(tmpdir, server, monkeypatch):
+    tmpdir.join('a.bin.part').write_binary(b'x' * 1000)
+    tmpdir.join('a.bin.part.validator').write_binary(b'"v0"')
+    pool = fileutil.HTTPConnectionPool()
+    fileutil.download(server + '/data.bin', str(tmpdir.join('a.bin')), pool=pool)
+    assert tmpdir.join('a.bin').read_binary() == HTTP_DATA
+    assert RangeHandler.requests[-1][2] == 'bytes=1000-'
+
+    # Part longer than remote file, and validator still matches.
+    tmpdir.join('b.bin.part').write_binary(HTTP_DATA + b'x')
+    tmpdir.join('b.bin.part.validator').write_binary(b'"v1"')
+    puts = []
+    put = pool.put
+    monkeypatch.setattr(pool, 'put', lambda *args: puts.append(args) or put(*args))
+    fileutil.download(server + '/data.bin', str(tmpdir.join('b.bin')), pool=pool)
+    assert tmpdir.join('b.bin').read_binary() == HTTP_DATA
+    assert [i[2] for i in RangeHandler.requests[-2:]] == [
+        'bytes={}-'.format(len(HTTP_DATA) + 1), None]
+    assert len(puts) == 2
+    pool.clear()
+
+
+def test_copy_url(tmpdir, server):
+    dst = str(tmpdir.join('sub', 'a.bin'))
+    assert fileutil.copy(server + '/data.bin', dst) == dst
+    assert tmpdir.join('sub', 'a.bin').read_binary() == HTTP_DATA
+
+
+def test_sync_plan(tmpdir):
+    src, dst = tmpdir.join('src'), tmpdir.join('dst')
+    for i in ('same.exr', 'changed.exr', 'new.exr', 'sub/same.exr', 'sub/new/a.exr', 'kind'):
+        src.join(i).write('aaa', ensure=True)
+        src.join(i).setmtime(1000)
+    for i in ('same.exr', 'changed.exr', 'sub/same.exr', 'old.exr', 'old/a/b.exr', 'kind/a.exr'):
+        dst.join(i).write('aaa', ensure=True)
+        dst.join(i).setmtime(1000)
+    dst.join('changed.exr').setmtime(2000)
+
+    plan = fileutil.sync_plan(src, dst)
+    assert plan.copy == [(str(src.join(i)), str(dst.join(i)))
+                         for i in ('changed.exr', 'kind', 'new.exr', 'sub/new/a.exr')]
+    assert plan.skip == [(str(src.join(i)), str(dst.join(i)))
+                         for i in ('same.exr', 'sub/same.exr')]
+    assert plan.delete == [str(dst.join(i)) for i in ('kind', 'old', 'old.exr')]
+
+
+def test_manifest(tmpdir):
+    for i in ('a.exr', 'sub/b.exr', 'sub/c.exr'):
+        tmpdir.join('render', i).write(i, ensure=True)
+    manifest = tmpdir.join('render', 'manifest.sha1')
+    assert fileutil.write_manifest(tmpdir.join('render'), manifest) == 3
+    assert fileutil.verify_manifest(manifest) == []
+
+    tmpdir.join('render', 'sub', 'b.exr').write('changed')
+    tmpdir.join('render', 'sub', 'c.exr').remove()
+    assert fileutil.verify_manifest(manifest) == [
+        str(tmpdir.join('render', 'sub', i)) for i in ('b.exr', 'c.exr')]
+
+
+def test_delta_copy(tmpdir):
+    data = os.urandom(256 * 1024)
+    src, dst = tmpdir.join('src.nk'), tmpdir.join('dst.nk')
+    dst.write_binary(data)
+
+    changed = data[:100000] + b'changed' + data[100007:]
+    src.write_binary(changed)
+    src.setmtime(1000)
+    assert fileutil.delta_copy(src, dst, block_size=4096) == 4096
+    assert dst.read_binary() == changed
+    assert fileutil.is_same(src, dst)
+
+    appended = changed + b'tail'
+    src.write_binary(appended)
+    src.setmtime(2000)
+    assert fileutil.delta_copy(src, dst, block_size=4096) == 4
+    assert dst.read_binary() == appended
+    assert fileutil.is_same(src, dst)
+
+    inserted = b'inserted' + appended[:200000] + appended[204096:]
+    src.write_binary(inserted)
+    src.setmtime(3000)
+    assert fileutil.delta_copy(src, dst, block_size=4096) < 4096 * 3
+    assert dst.read_binary() == inserted
+    assert fileutil.is_same(src, dst)
+    assert not tmpdir.join('dst.nk.delta').check()
+
+    rewritten = os.urandom(len(data))
+    src.write_binary(rewritten)
+    assert fileutil.delta_copy(src, dst, block_size=4096) == len(rewritten)
+    assert dst.read_binary() == rewritten
+
+    assert fileutil.delta_copy(src, tmpdir.join('new.nk')) == len(rewritten)
+    assert tmpdir.join('new.nk').read_binary() == rewritten
@@ -0,0 +1,57 @@
+# -*- coding=UTF-8 -*-
+"""Test `frameset` module.  """
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import pytest
+import six
+
+from wlf.frameset import FrameSet
+
+
+def test_parse():
+    frames = FrameSet.parse('1-100x2,105,110-200')
+    assert len(frames) == 50 + 1 + 91
+    assert 99 in frames
+    assert 100 not in frames
+    assert 0 not in frames
+    assert six.text_type(frames) == '1-99x2,105,110-200'
+    assert FrameSet.parse(six.text_type(frames)) == frames
+    with pytest.raises(ValueError):
+        FrameSet.parse('10-1')
+    with pytest.raises(ValueError):
+        FrameSet.parse('a-b')
+
+
+def test_operations():
+    rendered = FrameSet([5, 3, 1, 2, 9, 8, 10])
+    expected = FrameSet.from_range(1, 10)
+    assert list(rendered) == [1, 2, 3, 5, 8, 9, 10]
+    assert list(rendered.intervals()) == [(1, 3), (5, 5), (8, 10)]
+    assert list(expected - rendered) == [4, 6, 7]
+    assert rendered | expected == expected
+    assert rendered & expected == rendered
+    assert rendered.gaps() == expected - rendered
+    assert (rendered.first, rendered.last) == (1, 10)
+    assert not FrameSet()
+
+
+def test_stepped_runs():
+    frames = FrameSet.parse('1-1000000x2')
+    assert frames.runs() == [(1, 999999, 2)]
+    assert len(frames) == 500000
+    assert 999999 in frames and 1000000 not in frames
+    assert frames.gaps().runs() == [(2, 999998, 2)]
+    assert FrameSet([1, 3, 6, 9, 12]).runs() == [(1, 1, 1), (3, 12, 3)]
+    assert (frames | FrameSet.from_range(2, 10, 2)).runs() == [
+        (1, 11, 1), (13, 999999, 2)]
+
+
+def test_add_unordered():
+    frames = FrameSet()
+    for i in reversed(range(100000)):
+        frames.add(i * 2)
+    assert frames.runs() == [(0, 199998, 2)]
+    frames.add(1)
+    assert six.text_type(frames) == '0-2,4-199998x2'
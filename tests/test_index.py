@@ -0,0 +1,80 @@
+# -*- coding=UTF-8 -*-
+"""Test `index` module.  """
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import errno
+import os
+
+from wlf.index import FootageIndex
+
+
+def _touch_dir(path, mtime):
+    os.utime(str(path), (mtime, mtime))
+
+
+def test_refresh(tmpdir):
+    root = tmpdir.join('render')
+    for tag in ('BG', 'CH_A'):
+        for version in (1, 2):
+            root.join('sc_001_{}'.format(tag), 'sc_001_v{}.0001.exr'.format(version)).write(
+                'aaa', ensure=True)
+    root.join('sc_002_BG', 'sc_002_v3.0001.exr').write('a', ensure=True)
+    root.join('sc_002_BG', 'old', 'sc_002_v1.0001.exr').write('a', ensure=True)
+    filename = str(tmpdir.join('index.db'))
+
+    with FootageIndex(filename) as index:
+        assert index.refresh(root) == 5
+        assert len(index.files(root)) == 6
+        record = index.get(root.join('sc_001_BG', 'sc_001_v2.0001.exr'))
+        assert (record.size, record.shot, record.version, record.tag) == (
+            3, 'sc_001', 2, 'BG')
+        assert index.refresh(root) == 0
+
+        assert ([os.path.relpath(i.path, str(root)) for i in index.latest_versions()] ==
+                [os.path.join('sc_001_BG', 'sc_001_v2.0001.exr'),
+                 os.path.join('sc_001_CH_A', 'sc_001_v2.0001.exr'),
+                 os.path.join('sc_002_BG', 'sc_002_v3.0001.exr')])
+        assert len(index.files_of_tag('BG')) == 3
+        assert len(index.files_of_tag('BG', root.join('sc_002_BG'))) == 1
+
+        root.join('sc_001_BG', 'sc_001_v3.0001.exr').write('a')
+        _touch_dir(root.join('sc_001_BG'), 1)
+        assert index.refresh(root) == 1
+        assert index.get(root.join('sc_001_BG', 'sc_001_v3.0001.exr'))
+
+        root.join('sc_002_BG', 'old').remove()
+        _touch_dir(root.join('sc_002_BG'), 1)
+        assert index.refresh(root) == 1
+        assert len(index.files(root.join('sc_002_BG'))) == 1
+
+    with FootageIndex(filename) as index:
+        assert len(index.files(root)) == 6
+        root.join('sc_002_BG').remove()
+        assert index.refresh(root) == 1
+        assert index.files(root.join('sc_002_BG')) == []
+        assert index.refresh(root, full=True) == 3
+
+
+def test_refresh_list_error(tmpdir, monkeypatch):
+    root = tmpdir.join('render')
+    for i in range(3):
+        root.join('sc_001_BG', 'sc_001_v1.{:04d}.exr'.format(i)).write('a', ensure=True)
+
+    with FootageIndex(str(tmpdir.join('index.db'))) as index:
+        assert index.refresh(root) == 2
+        root.join('sc_001_BG', 'sc_001_v1.0003.exr').write('a')
+        _touch_dir(root.join('sc_001_BG'), 1)
+
+        scandir = os.scandir
+
+        def _scandir(path):
+            raise OSError(errno.EIO, os.strerror(errno.EIO), path)
+        monkeypatch.setattr(os, 'scandir', _scandir)
+        assert index.refresh(root) == 0
+        assert len(index.files(root)) == 3
+
+        monkeypatch.setattr(os, 'scandir', scandir)
+        assert index.refresh(root) == 1
+        assert len(index.files(root)) == 4
@@ -4,6 +4,7 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+import pickle
 import sys
 
 from wlf import path
@@ -32,3 +33,127 @@ def test_get_encoded():
         '测试2': '测试2'.encode(encoding)
     }
     _test_func(path.get_encoded, test_case)
+
+
+def test_tag():
+    test_case = {
+        'Z:/MT/Render/image/MT_BG_co/MT_BG_co_Z/Z.001.exr': 'BG',
+        'Z:/QQFC2017/Render/SC_065/QQFC_sc065_CH2': 'CH2',
+        'Z:/EP13_09_sc151_CH_B/EP13_09_sc151_CH_B.0015.exr': 'CH_B',
+        'Z:/QQFC2017/Render/SC_031a/sc_031a_CH_B_ID/sc_031a_CH_B_ID.####.exr': 'ID_CH_B',
+        'Z:/EP16_05_sc135b_CH_B_OC/EP16_05_sc135b_CH_B_OC.####.exr': 'OCC_CH_B',
+    }
+    _test_func(lambda x: path.PurePath(x).tag, test_case)
+    assert path.resolve_tags(test_case.keys()) == list(test_case.values())
+
+
+def test_tag_pattern():
+    class _PurePath(path.PurePosixPath):
+        tag_pattern = r'MT_(.+)_'
+
+    assert _PurePath('MT/MT_BG_co_Z/Z.001.exr').tag == 'BG'
+    assert path.resolve_tags(['MT/MT_BG_co_Z/Z.001.exr'],
+                             pattern=r'MT_(.+)_') == ['BG']
+    assert path.resolve_tags(['Z.001.exr'], pattern=r'MT_(.+)_') == ['Z']
+    # Parent group is only underscores, resolve from file name instead.
+    assert _PurePath('/r/MT___AO/Z_depth.0082.exr').tag == 'DEPTH'
+
+
+def test_layer():
+    assert path.PurePath('MT_BG_co_PuzzleMatte1/PuzzleMatte1.001.exr').layer == 'PuzzleMatte1'
+    assert path.PurePath('MT_BG_co/MT_BG_co.001.exr').layer is None
+    assert path.PurePath('GIRaw.GI.001.exr').layer == 'GI'
+
+    class _PurePath(path.PurePosixPath):
+        layers = path.get_layers('arnold')
+
+    assert _PurePath('MT_BG_co_AO/AO.001.exr').layer == 'AO'
+    assert _PurePath('MT_BG_co_Z/Z.001.exr').layer is None
+
+    _PurePath.layers = path.get_layers('redshift', 'arnold')
+    assert _PurePath('MT_BG_co_AO/AO.001.exr').layer == 'AO'
+    assert _PurePath('MT_BG_co_Z/Z.001.exr').layer == 'Z'
+
+
+def test_parse_footages():
+    paths = ['Z:/MT/Render/MT_BG_co/MT_BG_co_PuzzleMatte1/PuzzleMatte1.{:04d}.exr'.format(i)
+             for i in range(1, 4)]
+    paths += ['sc_001_v20.nk', 'sc_001_BG.%04d.exr', 'hello world']
+    table = path.parse_footages(paths)
+    assert len(table) == len(paths)
+    for i, footage in zip(paths, table):
+        item = path.PurePath(i)
+        assert footage.shot == item.shot
+        assert footage.version == item.version
+        assert footage.tag == item.tag
+        assert footage.layer == item.layer
+        assert footage.footage_name == item.footage_name
+        assert footage.suffix == item.suffix
+    assert table.column('frame') == [1, 2, 3, None, None, None]
+
+    table = path.parse_footages(paths, processes=2, chunksize=2)
+    assert list(table) == list(path.parse_footages(paths))
+
+    restored = pickle.loads(pickle.dumps(table, protocol=2))
+    assert list(restored) == list(table)
+    restored.append(table[0])
+    assert restored.strings == table.strings
+
+
+def test_parse_footages_long_digits():
+    paths = ['a/shot.123456789012345678901.exr', 'a/sc_v99999999999999999999.exr',
+             'a/shot.0001.exr']
+    table = path.parse_footages(paths)
+    assert table.column('frame') == [123456789012345678901, None, 1]
+    assert table.column('version') == [None, 99999999999999999999, None]
+
+    merged = path.parse_footages(paths[2:])
+    merged.extend(table)
+    assert merged.column('frame') == [1, 123456789012345678901, None, 1]
+    restored = pickle.loads(pickle.dumps(table, protocol=2))
+    assert list(restored) == list(table)
+    assert list(path.parse_footages(paths, processes=2, chunksize=1)) == list(table)
+
+
+def test_memoized_properties():
+    item = path.PurePath('MT_BG_co_Z/sc_001_v2.Z.001.exr')
+    assert (item.shot, item.version, item.tag, item.layer) == ('sc_001', 2, 'BG', 'Z')
+    assert item.footage_name == 'sc_001_v2.Z'
+    item.tag_pattern = r'(.+)_co'
+    assert item.tag == 'MT_BG'
+    assert issubclass(path.PosixPath, path.PurePosixPath)
+    assert issubclass(path.WindowsPath, path.PureWindowsPath)
+
+    class _PurePath(path.PurePosixPath):
+        pass
+
+    item = _PurePath('MT_BG_co_Z/sc_001_v2.Z.001.exr')
+    assert item.version == 2
+    _PurePath.version_pattern = r'(.+)_v(\d+)\.'
+    assert item.version == 2
+    _PurePath.version_pattern = r'(.+)x(\d+)'
+    assert item.version is None
+    assert item.shot == 'sc_001_v2.Z.001'
+    _PurePath.tag_pattern = r'MT_(.+)_'
+    assert item.tag == 'BG'
+    _PurePath.layers = ['N']
+    assert item.layer is None
+
+
+def test_from_str():
+    assert path.PurePath.from_str('a/b.exr') == path.PurePath('a/b.exr')
+    assert isinstance(path.PurePath.from_str('a'), path.PurePath)
+
+
+def test_interned():
+    pool = path.PathPool(maxsize=2)
+    item = pool.get(path.PurePosixPath, 'a//b.exr')
+    assert pool.get(path.PurePosixPath, 'a/b.exr') is item
+    assert pool.get(path.PurePosixPath, 'a//b.exr') is item
+    assert pool.get(path.PurePosixPath, 'c.exr') is not item
+    assert path.PurePath.interned('a/b') is path.PurePath.interned('a/b')
+
+    del item
+    pool.get(path.PurePosixPath, 'd.exr')
+    pool.get(path.PurePosixPath, 'e.exr')
+    assert len(pool) == 2
@@ -0,0 +1,50 @@
+# -*- coding=UTF-8 -*-
+"""Test `scan` module.  """
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import errno
+import os
+
+from wlf import concurrency, fileutil, scan
+
+
+def test_scan(tmpdir):
+    expected = set()
+    for tag in ('BG', 'CH_A'):
+        for frame in range(1, 4):
+            item = tmpdir.join('sc_001_{}'.format(tag), 'sc_001_v2_{}.{:04d}.exr'.format(tag, frame))
+            item.write('aaa', ensure=True)
+            expected.add(str(item))
+    tmpdir.join('a', 'b', 'c', 'thumbs.db').write('', ensure=True)
+    expected.add(str(tmpdir.join('a', 'b', 'c', 'thumbs.db')))
+
+    records = list(scan.scan(str(tmpdir), workers=2))
+    assert set(i.path for i in records) == expected
+    record = [i for i in records if i.path.endswith('CH_A.0001.exr')][0]
+    assert record.size == 3
+    assert record.mtime == os.stat(record.path).st_mtime
+    assert (record.shot, record.version, record.tag) == ('sc_001', 2, 'CH_A')
+
+    checking = [str(tmpdir.join('sc_001_BG', 'sc_001_v2_BG.0001.exr')),
+                str(tmpdir.join('sc_001_BG', 'sc_001_v2_BG.0009.exr'))]
+    assert fileutil.checked_exists(checking, records=records) == checking[:1]
+
+
+def test_scan_missing(tmpdir):
+    assert list(scan.scan(str(tmpdir.join('missing')))) == []
+
+
+def test_scan_error(tmpdir, monkeypatch):
+    def _scandir(path):
+        raise OSError(errno.EIO, os.strerror(errno.EIO), path)
+    monkeypatch.setattr(os, 'scandir', _scandir)
+    controller = concurrency.AIMDController(initial=4)
+    assert list(scan.scan(str(tmpdir), controller=controller)) == []
+    assert controller.limit == 2
+
+    controller = concurrency.AIMDController(initial=4)
+    checking = [str(tmpdir.join('a.exr'))]
+    assert fileutil.checked_exists(checking, controller=controller) == []
+    assert controller.limit == 2
@@ -0,0 +1,37 @@
+# -*- coding=UTF-8 -*-
+"""Test `sequence` module.  """
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+from wlf import sequence
+from wlf.path import PurePath
+
+
+def test_collapse():
+    paths = ['render/sc_001_BG.{:04d}.exr'.format(i) for i in (1, 2, 3, 5, 8)]
+    paths += ['render/sc_001_BG.{}.exr'.format(i) for i in (1001, 1002)]
+    paths += ['render/sc_001_CH.{}.exr'.format(i) for i in (9, 10, 11)]
+    paths += ['render/v1.2/thumbs.db']
+    result = sequence.collapse(reversed(paths))
+    assert [i.pattern for i in result] == [
+        'render/sc_001_BG.####.exr',
+        'render/sc_001_CH.#.exr',
+        'render/v1.2/thumbs.db']
+    seq = result[0]
+    assert (seq.first, seq.last, seq.padding) == (1, 1002, 4)
+    assert list(seq.missing())[:5] == [4, 6, 7, 9, 10]
+    assert len(seq) == 7
+    assert sorted(seq) == sorted(paths[:7])
+    assert list(result[1]) == paths[7:10]
+    assert list(result[2]) == ['render/v1.2/thumbs.db']
+
+
+def test_expand():
+    for pattern in ('test_sequence_###.exr',
+                    'test_sequence_%03d.exr',
+                    'test_sequence_%03d.###.exr',
+                    'test_{sequence}_%d.exr'):
+        result = list(sequence.expand(pattern, [1, 1234]))
+        assert result == [str(PurePath(pattern).with_frame(i))
+                          for i in (1, 1234)]
@@ -0,0 +1,181 @@
+# -*- coding=UTF-8 -*-
+"""File content hash with persistent cache.  """
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import hashlib
+import logging
+import mmap
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .codectools import get_encoded as e
+from .codectools import get_unicode as u
+
+LOGGER = logging.getLogger('com.wlf.checksum')
+
+_SCHEMA_VERSION = 1
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS digests (
+    dev INTEGER,
+    ino INTEGER,
+    path TEXT,
+    size INTEGER,
+    mtime_ns INTEGER,
+    algorithm TEXT,
+    digest TEXT,
+    PRIMARY KEY (dev, ino, path, size, mtime_ns, algorithm)
+);
+'''
+_BUFFER_SIZE = 8 * 1024 * 1024
+
+
+def stat_key(path):
+    """Cache key for @path, changes when file content may change.
+
+    Args:
+        path (path): File path.
+
+    Raises:
+        OSError: Can not stat file.
+
+    Returns:
+        tuple: (device, inode, path, size, mtime_ns),
+            path is only used when file system has no inode.
+    """
+
+    stat = os.stat(e(path))
+    mtime_ns = getattr(stat, 'st_mtime_ns', None)
+    if mtime_ns is None:
+        mtime_ns = int(stat.st_mtime * 1e9)
+    return (stat.st_dev, stat.st_ino,
+            '' if stat.st_ino else os.path.normcase(os.path.abspath(u(path))),
+            stat.st_size, mtime_ns)
+
+
+def digest(path, algorithm='sha1'):
+    """Hash content of @path, through `mmap` when possible.
+
+    Args:
+        path (path): File path.
+        algorithm (str, optional): Defaults to 'sha1'. `hashlib` algorithm.
+
+    Returns:
+        six.text_type: Hex digest.
+    """
+
+    ret = hashlib.new(algorithm)
+    with open(e(path), 'rb') as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, EnvironmentError):
+            # Empty file or file system not support mmap.
+            data = None
+        if data is not None:
+            try:
+                ret.update(data)
+            finally:
+                data.close()
+        else:
+            for buf in iter(lambda: f.read(_BUFFER_SIZE), b''):
+                ret.update(buf)
+    return u(ret.hexdigest())
+
+
+class HashCache(object):
+    """Content hash cache, unchanged files are never read again.
+
+    Digests are keyed by `stat_key`.
+
+    Args:
+        filename (str, optional): Defaults to ':memory:'. SQLite database file.
+        algorithm (str, optional): Defaults to 'sha1'. `hashlib` algorithm.
+        workers (int, optional): Defaults to 4. Max files hashed at same time.
+    """
+
+    def __init__(self, filename=':memory:', algorithm='sha1', workers=4):
+        self.algorithm = algorithm
+        self.workers = workers
+        self._conn = sqlite3.connect(u(filename))
+        if self._conn.execute('PRAGMA user_version').fetchone()[0] != _SCHEMA_VERSION:
+            self._conn.executescript(_SCHEMA)
+            self._conn.execute('PRAGMA user_version = {}'.format(_SCHEMA_VERSION))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self):
+        """Close database.  """
+
+        self._conn.close()
+
+    def _get(self, key):
+        row = self._conn.execute(
+            'SELECT digest FROM digests WHERE dev = ? AND ino = ? AND path = ? '
+            'AND size = ? AND mtime_ns = ? AND algorithm = ?',
+            key + (self.algorithm,)).fetchone()
+        return row[0] if row else None
+
+    def _hash(self, path, key):
+        ret = digest(path, self.algorithm)
+        try:
+            if stat_key(path) != key:
+                LOGGER.warning('File changed during hash: %s', path)
+                key = None
+        except OSError:
+            key = None
+        return path, key, ret
+
+    def hash(self, path):
+        """Hash of @path.
+
+        Args:
+            path (path): File path.
+
+        Returns:
+            six.text_type: Hex digest.
+        """
+
+        return dict(self.hash_many((path,)))[path]
+
+    def hash_many(self, paths):
+        """Hash of @paths, files are stat and hashed in thread pool.
+
+        Args:
+            paths (iterable): File paths.
+
+        Raises:
+            OSError: File not readable.
+
+        Returns:
+            generator: (path, hex digest) for each path,
+                cached first, then in finish order.
+        """
+
+        paths = list(paths)
+        executor = ThreadPoolExecutor(self.workers)
+        futures = []
+        try:
+            for path, key in zip(paths, executor.map(stat_key, paths)):
+                ret = self._get(key)
+                if ret is None:
+                    futures.append(executor.submit(self._hash, path, key))
+                else:
+                    yield path, ret
+            for future in as_completed(futures):
+                path, key, ret = future.result()
+                if key is not None:
+                    with self._conn:
+                        self._conn.execute(
+                            'INSERT OR REPLACE INTO digests VALUES (?, ?, ?, ?, ?, ?, ?)',
+                            key + (self.algorithm, ret))
+                yield path, ret
+        finally:
+            for i in futures:
+                i.cancel()
+            executor.shutdown(wait=True)
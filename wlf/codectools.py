@@ -3,7 +3,9 @@
 
 from __future__ import print_function, unicode_literals
 
+import codecs as _codecs
 import locale
+import ntpath
 import os
 import sys
 
@@ -34,26 +36,165 @@ def u_print(msg, **kwargs):
     print(msg, **kwargs)
 
 
-def get_unicode(input_bytes, codecs=('UTF-8', 'GBK')):
-    """Return unicode string by try decode @input_bytes with @codecs.  """
+_CODEC_CANDIDATES = {}
+_CODEC_MEMO = {}
+_CODEC_PERMISSIVE = {}
+_ALL_BYTES = bytes(bytearray(range(256)))
 
-    if isinstance(input_bytes, (six.text_type, int)):
-        return six.text_type(input_bytes)
 
+def _locale_encoding():
+    try:
+        return locale.getdefaultlocale()[1]
+    except ValueError:
+        return None
+
+
+def _codec_candidates(codecs):
+    """Normalized codec names to try in order, UTF-8 always comes first.  """
+
+    key = tuple(codecs)
     try:
-        input_bytes = six.binary_type(input_bytes)
-    except TypeError:
+        return _CODEC_CANDIDATES[key]
+    except KeyError:
+        pass
+
+    ret = []
+    for i in ('UTF-8',) + key + (sys.getfilesystemencoding(), _locale_encoding()):
+        if not i:
+            continue
+        try:
+            name = _codecs.lookup(i).name
+        except LookupError:
+            continue
+        if name not in ret:
+            ret.append(name)
+    ret = _CODEC_CANDIDATES[key] = tuple(ret)
+    return ret
+
+
+def _is_permissive(codec):
+    """Whether @codec decodes any bytes, e.g. latin-1.  """
+
+    try:
+        return _CODEC_PERMISSIVE[codec]
+    except KeyError:
+        pass
+    try:
+        _ALL_BYTES.decode(codec)
+        ret = True
+    except UnicodeDecodeError:
+        ret = False
+    _CODEC_PERMISSIVE[codec] = ret
+    return ret
+
+
+def get_unicode(input_bytes, codecs=('UTF-8', 'GBK'), source=None):
+    """Return unicode string by try decode @input_bytes with @codecs.
+
+    UTF-8 is tried first, then the codec last succeeded for @source,
+    so names from a same non UTF-8 share do not fail repeatedly.
+    Codecs decode any bytes (e.g. latin-1) are never moved
+    ahead of others, they are only tried in given order.
+
+    Args:
+        input_bytes (bytes): Data to decode, other type will be
+            converted to unicode directly.
+        codecs (tuple, optional): Defaults to ('UTF-8', 'GBK').
+            Codecs to try, file system and locale encoding are tried after.
+        source (hashable, optional): Defaults to None.
+            Where the data come from, e.g. a share root.
+            Succeeded codec is only remembered when given.
+
+    Raises:
+        UnicodeDecodeError: No codec can decode the data.
+
+    Returns:
+        six.text_type: Decoded text.
+    """
+
+    if type(input_bytes) is text_type:  # pylint: disable=unidiomatic-typecheck
+        return input_bytes
+    if isinstance(input_bytes, (six.text_type, int)):
         return six.text_type(input_bytes)
 
+    if not isinstance(input_bytes, six.binary_type):
+        try:
+            input_bytes = six.binary_type(input_bytes)
+        except TypeError:
+            return six.text_type(input_bytes)
+
+    candidates = _codec_candidates(codecs)
     try:
-        return input_bytes.decode()
+        return input_bytes.decode(candidates[0])
     except UnicodeDecodeError as ex:
-        for i in tuple(codecs) + (sys.getfilesystemencoding(), locale.getdefaultlocale()[1]):
-            try:
-                return six.text_type(input_bytes, i)
-            except UnicodeDecodeError:
-                continue
-        raise ex
+        error = ex
+
+    rest = candidates[1:]
+    memo = None if source is None else _CODEC_MEMO.get(source)
+    if memo in rest and not any(
+            _is_permissive(i) for i in rest[:rest.index(memo)]):
+        rest = (memo,) + tuple(i for i in rest if i != memo)
+    for i in rest:
+        try:
+            ret = input_bytes.decode(i)
+        except UnicodeDecodeError:
+            continue
+        if source is not None and i != memo and not _is_permissive(i):
+            _CODEC_MEMO[source] = i
+        return ret
+    raise error
+
+
+def decode_many(items, codecs=('UTF-8', 'GBK'), source=None):
+    """Decode many names at once, e.g. a listing returned as bytes.
+
+    >>> decode_many([b'a', '测试'.encode('gbk'), '测试'.encode('utf-8')])
+    [u'a', u'\\u6d4b\\u8bd5', u'\\u6d4b\\u8bd5']
+
+    Args:
+        items (iterable): Data to decode.
+        codecs (tuple, optional): Defaults to ('UTF-8', 'GBK').
+            Codecs to try, same as `get_unicode`.
+        source (hashable, optional): Defaults to None.
+            Where the data come from, same as `get_unicode`.
+
+    Returns:
+        list: Decoded texts.
+    """
+
+    codecs = _codec_candidates(codecs)
+    return [get_unicode(i, codecs, source) for i in items]
+
+
+def _path_source(path):
+    drive, rest = ntpath.splitdrive(path)
+    if drive:
+        return drive
+    parts = rest.replace(b'\\', b'/').lstrip(b'/').split(b'/', 1)
+    return parts[0] if len(parts) > 1 else b''
+
+
+def decode_path(path, codecs=('UTF-8', 'GBK')):
+    """Same as `get_unicode`, drive or top directory of @path is the source.
+
+    Names from one share are usually encoded by one codec,
+    so this remembers the codec for each share.
+
+    >>> decode_path('Z:/测试.exr'.encode('gbk'))
+    u'Z:/\u6d4b\u8bd5.exr'
+
+    Args:
+        path (bytes): Path to decode, other type is same as `get_unicode`.
+        codecs (tuple, optional): Defaults to ('UTF-8', 'GBK').
+            Codecs to try, same as `get_unicode`.
+
+    Returns:
+        six.text_type: Decoded path.
+    """
+
+    if isinstance(path, six.binary_type):
+        return get_unicode(path, codecs, _path_source(path))
+    return get_unicode(path, codecs)
 
 
 def get_encoded(input_str, encoding=None):
@@ -0,0 +1,170 @@
+# -*- coding=UTF-8 -*-
+"""Adaptive concurrency for network file system operations.  """
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import errno
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+LOGGER = logging.getLogger('com.wlf.concurrency')
+
+_CONGESTION_ERRNOS = set(getattr(errno, i) for i in (
+    'ETIMEDOUT', 'EAGAIN', 'EBUSY', 'EIO', 'ECONNRESET', 'ECONNABORTED', 'EHOSTUNREACH'
+) if hasattr(errno, i))
+
+
+class AIMDController(object):
+    """Limit in-flight operations with additive increase, multiplicative decrease.
+
+    Latency and throughput are measured for every window of finished operations,
+    with `latency` @metric, limit grows by @increase while latency is near
+    the best seen or throughput still improves,
+    with `throughput` @metric, limit grows while throughput (amount per second)
+    is near the best seen, this suits operations of very different amount,
+    e.g. copy files of mixed size.
+    Otherwise and when operation failed, limit shrinks by @decrease.
+
+    >>> controller = AIMDController(maximum=16)
+    >>> with controller.slot():
+    ...     pass
+    >>> controller.limit
+    4
+
+    Args:
+        initial (int, optional): Defaults to 4. Initial limit.
+        minimum (int, optional): Defaults to 1. Min limit.
+        maximum (int, optional): Defaults to 32. Max limit,
+            thread pool should have this many workers.
+        increase (int, optional): Defaults to 1. Added to limit.
+        decrease (float, optional): Defaults to 0.5. Multiplied to limit.
+        tolerance (float, optional): Defaults to 2.0. Latency more than
+            best latency multiplied by this, or throughput less than
+            best throughput divided by this is considered congested.
+        metric (str, optional): Defaults to 'latency'.
+            `latency` or `throughput`, measurement to detect congestion.
+    """
+
+    def __init__(self, initial=4, minimum=1, maximum=32,
+                 increase=1, decrease=0.5, tolerance=2.0, metric='latency'):
+        if metric not in ('latency', 'throughput'):
+            raise ValueError('Unknown metric: {}'.format(metric))
+        self.metric = metric
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = max(minimum, min(initial, maximum))
+        self.increase = increase
+        self.decrease = decrease
+        self.tolerance = tolerance
+        self._in_flight = 0
+        self._cond = threading.Condition()
+        self._window = []
+        self._window_start = time.time()
+        self._best_latency = None
+        self._best_throughput = None
+        self._throughput = None
+
+    def acquire(self):
+        """Wait until in-flight operations under limit.
+
+        Returns:
+            float: Start time, pass to `release`.
+        """
+
+        with self._cond:
+            while self._in_flight >= self.limit:
+                self._cond.wait()
+            self._in_flight += 1
+        return time.time()
+
+    def release(self, start_time, amount=1, failed=False):
+        """Finish an operation.
+
+        Args:
+            start_time (float): Return value of `acquire`.
+            amount (int, optional): Defaults to 1. Work done by this operation,
+                e.g. copied bytes, latency is measured per amount.
+            failed (bool, optional): Defaults to False. Operation failed.
+        """
+
+        latency = (time.time() - start_time) / max(amount, 1)
+        with self._cond:
+            self._in_flight -= 1
+            self._window.append((latency, amount))
+            if failed:
+                self._set_limit(self.limit * self.decrease)
+            elif len(self._window) >= max(self.limit, 4):
+                self._adjust()
+            self._cond.notify_all()
+
+    def _set_limit(self, value):
+        limit = max(self.minimum, min(int(value), self.maximum))
+        if limit != self.limit:
+            LOGGER.debug('Concurrency limit: %d -> %d', self.limit, limit)
+        self.limit = limit
+        self._window = []
+        self._window_start = time.time()
+
+    def _adjust(self):
+        throughput = (sum(i[1] for i in self._window)
+                      / max(time.time() - self._window_start, 1e-6))
+        if self.metric == 'throughput':
+            if self._best_throughput is None:
+                self._best_throughput = throughput
+            else:
+                # Slowly forget best throughput, share load may change.
+                self._best_throughput = max(throughput, self._best_throughput * 0.9)
+            congested = throughput * self.tolerance < self._best_throughput
+        else:
+            congested = self._latency_congested(throughput)
+        self._throughput = throughput
+        if congested:
+            self._set_limit(self.limit * self.decrease)
+        else:
+            self._set_limit(self.limit + self.increase)
+
+    def _latency_congested(self, throughput):
+        latency = sum(i[0] for i in self._window) / len(self._window)
+        if self._best_latency is None:
+            self._best_latency = latency
+        else:
+            # Slowly forget best latency, share load may change.
+            self._best_latency = min(latency, self._best_latency * 1.1)
+        return (latency > self._best_latency * self.tolerance
+                and self._throughput is not None
+                and throughput <= self._throughput)
+
+    @contextmanager
+    def slot(self, amount=1):
+        """Run an operation under limit.
+
+        Time out and IO errors are considered congestion.
+
+        Args:
+            amount (int, optional): Defaults to 1. Work done by this operation.
+        """
+
+        start_time = self.acquire()
+        try:
+            yield
+        except EnvironmentError as ex:
+            self.release(start_time, amount,
+                         failed=getattr(ex, 'errno', None) in _CONGESTION_ERRNOS)
+            raise
+        except BaseException:
+            self.release(start_time, amount)
+            raise
+        self.release(start_time, amount)
+
+    def wrap(self, func):
+        """Decorate @func to run under limit.  """
+
+        @wraps(func)
+        def _func(*args, **kwargs):
+            with self.slot():
+                return func(*args, **kwargs)
+        return _func
@@ -4,8 +4,14 @@ from __future__ import absolute_import, print_function, unicode_literals
 
 import json
 import mimetypes
+import multiprocessing
+import multiprocessing.dummy
 import os
+import sqlite3
+import threading
 import time
+import zlib
+from collections import OrderedDict
 from logging import getLogger
 from subprocess import PIPE
 from tempfile import mktemp
@@ -14,6 +20,7 @@ import six
 
 from .codectools import get_encoded as e
 from .codectools import get_unicode as u
+from .concurrency import AIMDController
 from .decorators import run_with_semaphore
 from .fileutil import is_same
 from .path import Path
@@ -28,36 +35,66 @@ if six.PY3:
 LOGGER = getLogger('com.wlf.ffmpeg')
 
 
+def _gif_filters(width=None, height=None):
+    return 'fps=15,scale={}:{}:flags=lanczos'.format(
+        -1 if width is None else width,
+        -1 if height is None else height)
+
+
 @run_with_semaphore(2)
 def generate_gif(filename, output=None, **kwargs):
-    """Generate a gif with same name.  """
+    """Generate a gif with same name.
+
+    Palette is generated from a first decode then used in a second one.
+    With @single_pass, palette is generated and used in one filter graph,
+    so source only decoded once, but all frames are buffered in memory
+    until palette generated, only use it for short clips.
+
+    Args:
+        filename (path): File to convert.
+        output (path, optional): Defaults to None. Output filepath.
+        width (int, optional): Output width.
+        height (int, optional): Output height.
+        single_pass (bool, optional): Defaults to False.
+            Generate palette in same ffmpeg invocation.
+
+    Returns:
+        wlf.Path: output path.
+    """
 
     path = Path(filename)
-    width = kwargs.get('width')
-    height = kwargs.get('height')
-    _palette = mktemp('.png')
-    _filters = 'fps=15,scale={}:{}:flags=lanczos'.format(
-        -1 if width is None else width,
-        -1 if height is None else height)
+    _filters = _gif_filters(kwargs.get('width'), kwargs.get('height'))
     ret = Path(Path(output or path).with_suffix('.gif'))
 
     # Skip generated.
     if is_same(path, ret):
         return ret
 
-    # Generate palette
-    cmd = ['ffmpeg', '-i', filename,
-           '-vf', '{}, palettegen'.format(_filters),
-           '-y', _palette]
-    _try_run_cmd(cmd, 'Error during generate gif palette',
-                 cwd=str(ret.parent))
-    # Generate gif
-    cmd = ['ffmpeg', '-i', filename,
-           '-i', _palette, '-lavfi', '{} [x]; [x][1:v] paletteuse'.format(
-               _filters),
-           '-y', ret]
     start_time = time.time()
-    _try_run_cmd(cmd, 'Error during generate gif', cwd=str(ret.parent))
+    if kwargs.get('single_pass'):
+        cmd = ['ffmpeg', '-i', filename,
+               '-lavfi', '{},split [a][b]; [a] palettegen [p]; [b][p] paletteuse'.format(
+                   _filters),
+               '-y', ret]
+        _try_run_cmd(cmd, 'Error during generate gif', cwd=str(ret.parent))
+    else:
+        _palette = mktemp('.png')
+        try:
+            # Generate palette
+            cmd = ['ffmpeg', '-i', filename,
+                   '-vf', '{}, palettegen'.format(_filters),
+                   '-y', _palette]
+            _try_run_cmd(cmd, 'Error during generate gif palette',
+                         cwd=str(ret.parent))
+            # Generate gif
+            cmd = ['ffmpeg', '-i', filename,
+                   '-i', _palette, '-lavfi', '{} [x]; [x][1:v] paletteuse'.format(
+                       _filters),
+                   '-y', ret]
+            _try_run_cmd(cmd, 'Error during generate gif', cwd=str(ret.parent))
+        finally:
+            if os.path.exists(_palette):
+                os.remove(_palette)
 
     # Copy mtime for skip generated.
     os.utime(e(ret), (time.time(), path.stat().st_mtime))
@@ -66,6 +103,29 @@ def generate_gif(filename, output=None, **kwargs):
     return ret
 
 
+def _mp4_filters(width=None, height=None):
+    return 'scale={}:{}:flags=lanczos'.format(
+        '-2' if width is None else int(width) // 2 * 2,
+        r'min(trunc(ih / 2) * 2\, 1080)' if height is None else int(height) // 2 * 2)
+
+
+def _mp4_options(duration=None, limit_size=None):
+    ret = [
+        '-movflags', 'faststart',
+        '-vcodec', 'libx264',
+        '-preset', 'veryslow',
+        '-tune', 'fastdecode',
+        '-crf', '18',
+        '-pix_fmt', 'yuv420p',
+        '-f', 'mp4'
+    ]
+    if duration and duration > 0:
+        ret.extend(['-t', duration])
+    if limit_size:
+        ret.extend(['-fs', limit_size])
+    return ret
+
+
 @run_with_semaphore(1)
 def generate_mp4(filename, output=None, **kwargs):
     """Convert a video file to mp4 format.
@@ -85,26 +145,8 @@ def generate_mp4(filename, output=None, **kwargs):
     duration = kwargs.get('duration')
     limit_size = kwargs.get('limit_size')
 
-    output_options = [
-        '-movflags', 'faststart',
-        '-vcodec', 'libx264',
-        '-preset', 'veryslow',
-        '-tune', 'fastdecode',
-        '-crf', '18',
-        '-pix_fmt', 'yuv420p',
-        '-f', 'mp4'
-    ]
-    if duration and duration > 0:
-        output_options.extend(['-t', duration])
-    if limit_size:
-        output_options.extend(['-fs', limit_size])
-
-    output_options.extend(['-vf',
-                           'scale={}:{}:flags=lanczos'.format(
-                               '-2'
-                               if width is None else int(width) // 2 * 2,
-                               r'min(trunc(ih / 2) * 2\, 1080)'
-                               if height is None else int(height) // 2 * 2)])
+    output_options = (_mp4_options(duration, limit_size)
+                      + ['-vf', _mp4_filters(width, height)])
 
     # Skip generated.
     if is_same(path, ret):
@@ -123,6 +165,24 @@ def generate_mp4(filename, output=None, **kwargs):
     return ret
 
 
+def _jpg_filters(width=None, height=None):
+    return 'scale={}:{}:flags=lanczos'.format(
+        '-1' if width is None else int(width),
+        r'min(ih\, 1080)' if height is None else int(height))
+
+
+def _poster_time(path):
+    type_, _ = mimetypes.guess_type(six.text_type(path))
+    if six.text_type(type_).startswith('video/'):
+        try:
+            mediainfo = probe(path)
+            if mediainfo.frames() > 1:
+                return mediainfo.duration() / 2
+        except (ValueError, KeyError):
+            pass
+    return None
+
+
 @run_with_semaphore(8)
 def generate_jpg(filename, output=None, **kwargs):
     """Convert given file to jpg format.
@@ -136,12 +196,8 @@ def generate_jpg(filename, output=None, **kwargs):
     """
 
     path = Path(filename)
-    width = kwargs.get('width')
-    height = kwargs.get('height')
     ret = Path(Path(output or path).with_suffix('.jpg'))
-    _filters = 'scale={}:{}:flags=lanczos'.format(
-        '-1' if width is None else int(width),
-        r'min(ih\, 1080)' if height is None else int(height))
+    _filters = _jpg_filters(kwargs.get('width'), kwargs.get('height'))
 
     # Skip generated.
     if is_same(path, ret):
@@ -150,15 +206,9 @@ def generate_jpg(filename, output=None, **kwargs):
     input_options = [
         '-noaccurate_seek'
     ]
-
-    type_, _ = mimetypes.guess_type(six.text_type(path))
-    if six.text_type(type_).startswith('video/'):
-        try:
-            mediainfo = probe(path)
-            if mediainfo.frames() > 1:
-                input_options.extend(['-ss', mediainfo.duration() / 2])
-        except (ValueError, KeyError):
-            pass
+    poster_time = _poster_time(path)
+    if poster_time is not None:
+        input_options.extend(['-ss', poster_time])
 
     # Generate.
     cmd = (['ffmpeg', '-y', '-hide_banner']
@@ -175,10 +225,191 @@ def generate_jpg(filename, output=None, **kwargs):
     return ret
 
 
-class ProbeResult(dict):
-    """Optimized dict for probe result.  """
+_PREVIEW_KINDS = {
+    '.jpg': 'jpg',
+    '.jpeg': 'jpg',
+    '.gif': 'gif',
+    '.mp4': 'mp4',
+}
+
+
+def _preview_kind(output):
+    suffix = os.path.splitext(six.text_type(output))[1].lower()
+    try:
+        return _PREVIEW_KINDS[suffix]
+    except KeyError:
+        raise ValueError('Unsupported preview format: {}'.format(output))
+
+
+def _preview_graph(outputs, poster_time=None):
+    """Build ffmpeg arguments that decode input once for all @outputs.
+
+    Args:
+        outputs (list): (output path, options dict) pairs.
+        poster_time (float, optional): Defaults to None. Seconds of jpg poster frame.
+
+    Returns:
+        list: ffmpeg arguments after input.
+    """
+
+    labels = ''.join('[v{}]'.format(i) for i in range(len(outputs)))
+    graph = ['[0:v] split={} {}'.format(len(outputs), labels)]
+    ret = []
+    for index, (output, options) in enumerate(outputs):
+        kind = _preview_kind(output)
+        width, height = options.get('width'), options.get('height')
+        if kind == 'jpg':
+            filters = _jpg_filters(width, height)
+            if poster_time is not None:
+                filters = 'trim=start={},setpts=PTS-STARTPTS,{}'.format(
+                    poster_time, filters)
+            graph.append('[v{0}] {1} [o{0}]'.format(index, filters))
+            output_options = ['-q:v', '1', '-frames:v', '1']
+        elif kind == 'gif':
+            graph.append('[v{0}] {1},split [a{0}][b{0}]; [a{0}] palettegen [p{0}]; '
+                         '[b{0}][p{0}] paletteuse [o{0}]'.format(
+                             index, _gif_filters(width, height)))
+            output_options = []
+        else:
+            graph.append('[v{0}] {1} [o{0}]'.format(
+                index, _mp4_filters(width, height)))
+            output_options = ['-map', '0:a?'] + _mp4_options(
+                options.get('duration'), options.get('limit_size'))
+        ret.extend(['-map', '[o{}]'.format(index)] + output_options + [output])
+    return ['-filter_complex', '; '.join(graph)] + ret
+
+
+@run_with_semaphore(1)
+def generate_previews(filename, outputs):
+    """Generate several previews with one ffmpeg decode.
+
+    Output format is decided by suffix:
+    jpg is a poster at middle of video, gif and mp4 are same as
+    `generate_gif` and `generate_mp4`,
+    use several mp4 outputs with different size for a resolution ladder.
+
+    >>> generate_previews('sc_001_v1.mov', [
+    ...     'sc_001_v1.jpg', ('sc_001_v1.gif', {'width': 480}), 'sc_001_v1.mp4',
+    ...     ('sc_001_v1_720p.mp4', {'height': 720})]) # doctest: +SKIP
+
+    Args:
+        filename (path): Source file.
+        outputs (list): Output path, or (output path, options dict) pair,
+            options are `width`, `height` and mp4 only `duration`, `limit_size`.
+
+    Raises:
+        ValueError: Unsupported output format.
+        GenerateError: ffmpeg failed.
+
+    Returns:
+        list[wlf.Path]: output paths, in same order.
+    """
+
+    path = Path(filename)
+    ret = []
+    pending = []
+    for i in outputs:
+        output, options = i if isinstance(i, tuple) else (i, {})
+        _preview_kind(output)
+        output = Path(output)
+        ret.append(output)
+        # Skip generated.
+        if not is_same(path, output):
+            pending.append((output, options))
+    if not pending:
+        return ret
+
+    poster_time = None
+    if any(_preview_kind(i[0]) == 'jpg' for i in pending):
+        poster_time = _poster_time(path)
+    cmd = (['ffmpeg', '-y', '-hide_banner', '-i', filename]
+           + _preview_graph(pending, poster_time))
+    start_time = time.time()
+    _try_run_cmd(cmd, 'Error during generate previews',
+                 cwd=str(pending[0][0].parent))
+    LOGGER.info('生成预览: %s, 耗时 %s 秒',
+                [six.text_type(i[0]) for i in pending], time.time() - start_time)
+
+    # Copy mtime for skip generated.
+    for output, _ in pending:
+        os.utime(e(output), (time.time(), path.stat().st_mtime))
+
+    return ret
+
+
+_PROBE_STRINGS = {}
+_PROBE_STRINGS_MAXSIZE = 65536
+
+
+def _intern(value):
+    if not isinstance(value, six.text_type) or len(value) > 32:
+        return value
+    ret = _PROBE_STRINGS.get(value)
+    if ret is None:
+        ret = value
+        if len(_PROBE_STRINGS) < _PROBE_STRINGS_MAXSIZE:
+            _PROBE_STRINGS[value] = value
+    return ret
+
+
+def _interned_pairs(pairs):
+    return dict((_intern(k), _intern(v)) for k, v in pairs)
+
+
+def _summarize(data):
+    """Extract (duration, fps, width, height, codec, pix_fmt) from probe data.  """
+
+    duration = (data.get('format') or {}).get('duration')
+    try:
+        duration = float(duration)
+    except (TypeError, ValueError):
+        duration = None
+
+    fps, video = None, None
+    for i in data.get('streams') or ():
+        if i.get('codec_type') != 'video':
+            continue
+        video = video or i
+        try:
+            fps = ProbeResult.parse_div(i['r_frame_rate'])
+        except (KeyError, ValueError, ZeroDivisionError):
+            continue
+        if fps:
+            video = i
+            break
+    video = video or {}
+    return (duration, fps or None, video.get('width'), video.get('height'),
+            video.get('codec_name'), video.get('pix_fmt'))
+
+
+class _ProbeFields(object):
+    """Common accessors, subclass provides `_fields`.  """
+
+    __slots__ = ()
+
+    @property
+    def width(self):
+        """int or None: Width of first video stream.  """
+
+        return self._fields()[2]
+
+    @property
+    def height(self):
+        """int or None: Height of first video stream.  """
+
+        return self._fields()[3]
 
-    error = None
+    @property
+    def codec(self):
+        """unicode or None: Codec name of first video stream.  """
+
+        return self._fields()[4]
+
+    @property
+    def pix_fmt(self):
+        """unicode or None: Pixel format of first video stream.  """
+
+        return self._fields()[5]
 
     def fps(self):
         """FPS for the file.
@@ -190,23 +421,25 @@ class ProbeResult(dict):
             float: FPS value.
         """
 
-        video_streams = [i for i in self['streams']
-                         if i['codec_type'] == 'video']
-        for i in video_streams:
-            value = self.parse_div(i['r_frame_rate'])
-            if value:
-                return value
-
-        raise ValueError('Can not determinate fps')
+        ret = self._fields()[1]
+        if ret is None:
+            raise ValueError('Can not determinate fps')
+        return ret
 
     def duration(self):
         """File duration in secondes.
 
+        Raises:
+            KeyError: Duration unknown.
+
         Returns:
             float: media duration.
         """
 
-        return float(self['format']['duration'])
+        ret = self._fields()[0]
+        if ret is None:
+            raise KeyError('duration')
+        return ret
 
     def frames(self):
         """Frames in this file.
@@ -217,6 +450,64 @@ class ProbeResult(dict):
 
         return int(round(self.duration() * self.fps()))
 
+
+class ProbeResult(_ProbeFields, dict):
+    """Optimized dict for probe result.
+
+    Keys and short values are shared between results created by `from_json`,
+    fields are read from current items on every access,
+    use `compact` to hold many results.
+
+    >>> result = ProbeResult.from_json(
+    ...     '{"format":{"duration":"2.0"},"streams":[{"codec_type":"video",'
+    ...     '"r_frame_rate":"25/1","width":1920,"height":1080,'
+    ...     '"codec_name":"h264","pix_fmt":"yuv420p"}]}')
+    >>> result.frames(), result.width, result.codec, result.pix_fmt
+    (50, 1920, u'h264', u'yuv420p')
+    >>> result['format']
+    {u'duration': u'2.0'}
+    """
+
+    __slots__ = ('error',)
+
+    def __init__(self, *args, **kwargs):
+        super(ProbeResult, self).__init__(*args, **kwargs)
+        self.error = None
+
+    @classmethod
+    def from_json(cls, text):
+        """Create result from ffprobe json output.
+
+        Args:
+            text (unicode): json text.
+
+        Raises:
+            ValueError: Not valid json.
+
+        Returns:
+            ProbeResult: Parsed result.
+        """
+
+        return cls(json.loads(u(text), object_pairs_hook=_interned_pairs))
+
+    def _fields(self):
+        return _summarize(self)
+
+    @property
+    def raw(self):
+        """Compact json text for this result.  """
+
+        return u(json.dumps(self, separators=(',', ':')))
+
+    def compact(self):
+        """Compact read-only copy for holding many results.
+
+        Returns:
+            CompactProbeResult: Copy of current items.
+        """
+
+        return CompactProbeResult(self)
+
     @classmethod
     def parse_div(cls, exp):
         """Parse divsion expression to float.
@@ -231,33 +522,338 @@ class ProbeResult(dict):
         assert isinstance(exp, (six.binary_type, six.text_type))
         return reduce(lambda a, b: float(a) / float(b), exp.split('/'))
 
+    def __reduce__(self):
+        return (_restore_probe_result, (dict(self), self.error))
+
+
+def _restore_probe_result(data, error):
+    ret = ProbeResult(data)
+    ret.error = error
+    return ret
+
+
+class CompactProbeResult(_ProbeFields):
+    """Read-only probe result, common fields are extracted once,
+    full data is kept as compressed json and parsed on demand.
+
+    Supports same field methods as `ProbeResult`
+    and read-only mapping access, use `result` for a real dict.
+
+    Args:
+        result (ProbeResult): Result to copy.
+    """
+
+    __slots__ = ('error', '_summary', '_data')
+
+    def __init__(self, result):
+        self.error = result.error
+        self._summary = _summarize(result)
+        self._data = zlib.compress(result.raw.encode('utf-8')) if result else None
+
+    def _fields(self):
+        return self._summary
+
+    @property
+    def raw(self):
+        """Compact json text for this result.  """
+
+        if self._data is None:
+            return '{}'
+        return zlib.decompress(self._data).decode('utf-8')
+
+    def result(self):
+        """New `ProbeResult` with full data.
+
+        Returns:
+            ProbeResult: Parsed result.
+        """
+
+        ret = ProbeResult.from_json(self.raw)
+        ret.error = self.error
+        return ret
+
+    def __getitem__(self, key):
+        return self.result()[key]
+
+    def get(self, key, default=None):
+        """Same as `dict.get`, parse full data.  """
+
+        return self.result().get(key, default)
+
+    def keys(self):
+        """Same as `dict.keys`, parse full data.  """
+
+        return self.result().keys()
+
+    def __iter__(self):
+        return iter(self.result())
+
+    def __contains__(self, key):
+        return key in self.result()
+
+    def __len__(self):
+        return len(self.result()) if self._data is not None else 0
+
+    def __bool__(self):
+        return self._data is not None
+
+    __nonzero__ = __bool__
+
+    def __eq__(self, other):
+        if isinstance(other, CompactProbeResult):
+            other = other.result()
+        return self.result() == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
 
 def _encode_cmd(cmd):
     return [e(i) if six.PY2 else u(i) for i in cmd]
 
 
-@run_with_semaphore(2)
-def probe(filename):
-    """Probe for media file info.
+class ProbeCache(object):
+    """Probe result cache keyed by (path, size, mtime_ns).
 
-    Args:
-        filename (pathLike object): file path.
+    Recently used results are kept in memory as `CompactProbeResult`,
+    results are also saved in a SQLite database when @filename given,
+    least recently used results are removed when exceed max size.
+    Empty results and results with error are never cached.
+    Database errors are logged and only memory is used for that operation.
 
-    Returns:
-        ProbeResult: Optimized dict to save result.
+    Args:
+        filename (str, optional): Defaults to None.
+            SQLite database file, None to disable disk cache.
+        maxsize (int, optional): Defaults to 100000. Max results on disk.
+        memory_maxsize (int, optional): Defaults to 4096. Max results in memory.
     """
 
+    def __init__(self, filename=None, maxsize=100000, memory_maxsize=4096):
+        self.filename = filename
+        self.maxsize = maxsize
+        self.memory_maxsize = memory_maxsize
+        self._memory = OrderedDict()
+        self._lock = threading.RLock()
+        self._conn = None
+        self._puts = 0
+
+    @staticmethod
+    def key(filename):
+        """Cache key for @filename.
+
+        Raises:
+            OSError: Can not stat file.
+
+        Returns:
+            tuple: (path, size, mtime_ns)
+        """
+
+        stat = os.stat(e(filename))
+        mtime_ns = getattr(stat, 'st_mtime_ns', None)
+        if mtime_ns is None:
+            mtime_ns = int(stat.st_mtime * 1e9)
+        return (os.path.normcase(os.path.abspath(u(filename))),
+                stat.st_size, mtime_ns)
+
+    def _connect(self):
+        if self._conn is None and self.filename:
+            try:
+                conn = sqlite3.connect(u(self.filename), timeout=1,
+                                       check_same_thread=False)
+                conn.execute(
+                    'CREATE TABLE IF NOT EXISTS probes ('
+                    'path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, '
+                    'result TEXT, error TEXT, atime REAL)')
+                conn.execute(
+                    'CREATE INDEX IF NOT EXISTS probes_atime ON probes (atime)')
+            except sqlite3.Error as ex:
+                LOGGER.warning('Disable probe disk cache: %s: %s', self.filename, ex)
+                self.filename = None
+                return None
+            self._conn = conn
+        return self._conn
+
+    def _remember(self, key, result):
+        self._memory.pop(key, None)
+        self._memory[key] = result
+        while len(self._memory) > self.memory_maxsize:
+            self._memory.popitem(last=False)
+
+    def get(self, key):
+        """Get cached result.
+
+        Args:
+            key (tuple): Return value of `key`.
+
+        Returns:
+            ProbeResult or None: New copy of cached result.
+        """
+
+        with self._lock:
+            ret = self._memory.get(key)
+            if ret is not None:
+                self._remember(key, ret)
+                return ret.result()
+            conn = self._connect()
+            if conn is None:
+                return None
+            try:
+                row = conn.execute(
+                    'SELECT result FROM probes WHERE path = ? AND size = ? AND mtime_ns = ?',
+                    key).fetchone()
+                if row is None:
+                    return None
+                with conn:
+                    conn.execute('UPDATE probes SET atime = ? WHERE path = ?',
+                                 (time.time(), key[0]))
+            except sqlite3.Error as ex:
+                LOGGER.warning('Can not read probe disk cache: %s', ex)
+                return None
+            ret = ProbeResult.from_json(row[0])
+            self._remember(key, ret.compact())
+            return ret
+
+    def put(self, key, result):
+        """Save result to cache, empty or error result is ignored.
+
+        Args:
+            key (tuple): Return value of `key`.
+            result (ProbeResult): Probe result.
+        """
+
+        if not result or result.error:
+            return
+        with self._lock:
+            self._remember(key, result.compact())
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                with conn:
+                    conn.execute(
+                        'INSERT OR REPLACE INTO probes VALUES (?, ?, ?, ?, ?, ?)',
+                        key + (result.raw, '', time.time()))
+                    self._puts += 1
+                    if self._puts >= max(self.maxsize // 16, 1):
+                        self._puts = 0
+                        self._evict(conn)
+            except sqlite3.Error as ex:
+                LOGGER.warning('Can not write probe disk cache: %s', ex)
+
+    def _evict(self, conn):
+        count = conn.execute('SELECT count(*) FROM probes').fetchone()[0]
+        if count > self.maxsize:
+            conn.execute(
+                'DELETE FROM probes WHERE path IN '
+                '(SELECT path FROM probes ORDER BY atime LIMIT ?)',
+                (count - self.maxsize,))
+
+    def clear(self):
+        """Remove all cached results.  """
+
+        with self._lock:
+            self._memory.clear()
+            conn = self._connect()
+            if conn is not None:
+                with conn:
+                    conn.execute('DELETE FROM probes')
+
+
+# Disk cache is enabled by setting database path to `WLF_PROBE_CACHE`.
+PROBE_CACHE = ProbeCache(os.getenv('WLF_PROBE_CACHE'))
+
+
+def _run_ffprobe(filename):
     cmd = _encode_cmd(['ffprobe', '-show_entries', 'format:streams',
-                       '-of', 'json', '-hide_banner',
+                       '-of', 'json=compact=1', '-hide_banner',
                        '-loglevel', 'error', filename])
     proc = Popen(cmd, stdout=PIPE, stderr=PIPE, env=os.environ)
     stdout, stderr = proc.communicate()
-    ret = json.loads(stdout)
-    ret = ProbeResult(ret)
-    ret.error = stderr
+    ret = ProbeResult.from_json(stdout)
+    ret.error = u(stderr)
+    return ret
+
+
+_probe = run_with_semaphore(2)(_run_ffprobe)  # pylint: disable=invalid-name
+
+
+def _cached_probe(filename, cache, run):
+    if cache is False:
+        return run(filename)
+    cache = cache or PROBE_CACHE
+    try:
+        key = cache.key(filename)
+    except OSError:
+        return run(filename)
+    ret = cache.get(key)
+    if ret is None:
+        ret = run(filename)
+        cache.put(key, ret)
     return ret
 
 
+def probe(filename, cache=None):
+    """Probe for media file info.
+
+    Args:
+        filename (pathLike object): file path.
+        cache (ProbeCache, optional): Defaults to None.
+            Result cache, `PROBE_CACHE` when not given, False to disable.
+
+    Returns:
+        ProbeResult: Optimized dict to save result.
+    """
+
+    return _cached_probe(filename, cache, _probe)
+
+
+def probe_many(paths, workers=None, cache=None, compact=False):
+    """Probe many media files in a thread pool.
+
+    Concurrent `ffprobe` processes start from CPU count,
+    and are adjusted by measured latency up to @workers.
+
+    >>> for path, result in probe_many(paths):  # doctest: +SKIP
+    ...     if not result:
+    ...         print(path, result.error)
+
+    Args:
+        paths (iterable): Media file paths.
+        workers (int, optional): Defaults to None.
+            Max concurrent probes, 4 times of CPU count when not given.
+        cache (ProbeCache, optional): Defaults to None.
+            Result cache, `PROBE_CACHE` when not given, False to disable.
+        compact (bool, optional): Defaults to False.
+            Yield `CompactProbeResult`, for holding many results.
+
+    Returns:
+        generator: (path, ProbeResult) in finish order,
+            result is empty with `error` set when probe failed.
+    """
+
+    cpu_count = multiprocessing.cpu_count()
+    controller = AIMDController(initial=cpu_count, maximum=workers or cpu_count * 4)
+    run = controller.wrap(_run_ffprobe)
+
+    def _probe_one(path):
+        try:
+            ret = _cached_probe(path, cache, run)
+        except Exception as ex:  # pylint: disable=broad-except
+            LOGGER.debug('Probe failed: %s: %s', path, ex)
+            ret = ProbeResult()
+            ret.error = six.text_type(ex)
+        return path, ret.compact() if compact else ret
+
+    pool = multiprocessing.dummy.Pool(controller.maximum)
+    try:
+        for i in pool.imap_unordered(_probe_one, paths):
+            yield i
+    finally:
+        pool.terminate()
+
+
 def _try_run_cmd(cmd, error_msg, **popen_kwargs):
     kwargs = {
         'stdout': PIPE,
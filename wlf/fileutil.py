@@ -5,25 +5,42 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
 import errno
+import hashlib
+import io
+import itertools
 import logging
+import math
+import mmap
 import multiprocessing.dummy
+import operator
 import os
 import shutil
 import sys
+import threading as _threading
+import zlib
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from subprocess import call
 
-from six.moves import urllib
+import six
+from six.moves import http_client, queue, urllib
 
+from .checksum import HashCache
 from .codectools import get_encoded as e
-from .codectools import get_unicode as u
-from .path import Path, PurePath
-from .progress import progress
+from .codectools import decode_path as u
+from .concurrency import AIMDController
+from .path import split_name, version_parser
+from .progress import core as progress_core
 
 LOGGER = logging.getLogger('com.wlf.fileutil')
 
 
-def copy(src, dst, threading=False):
-    """Copy src to dst."""
+def copy(src, dst, threading=False, workers=1, delta=False):
+    """Copy src to dst.
+
+    @workers > 1 copies large file in concurrent byte ranges, see `copy_file`.
+    @delta updates existed destination with changed blocks only, see `delta_copy`.
+    """
 
     def _mkdirs():
         dst_dir = os.path.dirname(dst_e)
@@ -36,34 +53,36 @@ def copy(src, dst, threading=False):
 
     src_e, dst_e = e(src), e(dst)
     src_u, dst_u = u(src), u(dst)
+    is_url = src_u.startswith(('http:', 'https:'))
     # Handle exceptions.
     if src_e == dst_e:
         LOGGER.warning('不能原地复制: %s', src_e)
         return dst_u
-    elif not os.path.exists(src_e):
+    elif not is_url and not os.path.exists(src_e):
         LOGGER.warning('尝试复制不存在的文件: %s', src_u)
         return None
 
     if threading:
         thread = multiprocessing.dummy.Process(
-            target=copy, args=(src_e, dst_e), kwargs={'threading': False})
+            target=copy, args=(src_e, dst_e),
+            kwargs={'threading': False, 'workers': workers, 'delta': delta})
         thread.start()
         return thread
 
-    if src_u.startswith('http:'):
+    if is_url:
         LOGGER.info('下载:\n\t\t%s\n\t->\t%s', src_u, dst_u)
         _mkdirs()
-        try:
-            src_fd = urllib.request.urlopen(src_e)
-            with open(dst_e, 'wb') as dst_fd:
-                dst_fd.write(src_fd.read())
-        finally:
-            src_fd.close()
+        download(src_u, dst_u)
     else:
         LOGGER.info('复制:\n\t\t%s\n\t->\t%s', src_u, dst_u)
         _mkdirs()
+        target = (os.path.join(dst_e, os.path.basename(src_e))
+                  if os.path.isdir(dst_e) else dst_e)
         try:
-            shutil.copy2(src_e, dst_e)
+            if delta and os.path.isfile(target):
+                delta_copy(src_e, target)
+            else:
+                copy_file(src_e, target, workers=workers)
         except OSError:
             if sys.platform == 'win32':
                 call(e(
@@ -80,34 +99,799 @@ def copy(src, dst, threading=False):
     return ret
 
 
-def version_filter(iterable):
+_COPY_BUFFER_SIZE = 1024 * 1024
+_ZERO_COPY_BLOCK_SIZE = 64 * 1024 * 1024
+_ZERO_COPY_UNSUPPORTED = set(getattr(errno, i) for i in (
+    'ENOSYS', 'EXDEV', 'EINVAL', 'EOPNOTSUPP', 'ENOTSUP', 'ENOTSOCK'
+) if hasattr(errno, i))
+
+
+def _copy_file_range(src_fd, dst_fd, offset, count):
+    return os.copy_file_range(src_fd, dst_fd, count, offset, offset)
+
+
+def _sendfile(src_fd, dst_fd, offset, count):
+    return os.sendfile(dst_fd, src_fd, offset, count)
+
+
+_ZERO_COPY_FUNCS = [func for name, func in (
+    ('copy_file_range', _copy_file_range),
+    ('sendfile', _sendfile),
+) if hasattr(os, name)]
+
+
+def _zero_copy(src_fd, dst_fd, size, callback):
+    """Copy file data inside kernel, return copied byte count.  """
+
+    copied = 0
+    for func in list(_ZERO_COPY_FUNCS):
+        try:
+            os.lseek(dst_fd, copied, os.SEEK_SET)
+            while copied < size:
+                count = func(src_fd, dst_fd, copied,
+                             min(_ZERO_COPY_BLOCK_SIZE, size - copied))
+                if not count:
+                    break
+                copied += count
+                callback(count)
+            return copied
+        except OSError as ex:
+            if ex.errno not in _ZERO_COPY_UNSUPPORTED:
+                raise
+            if ex.errno == errno.ENOSYS and func in _ZERO_COPY_FUNCS:
+                _ZERO_COPY_FUNCS.remove(func)
+            LOGGER.debug('Zero-copy not supported: %s: %s', func.__name__, ex)
+    return copied
+
+
+def _preallocate(fd, size):
+    # Not `posix_fallocate`, glibc emulates it by writing every block
+    # on file systems without native support, e.g. NFS and SMB shares.
+    os.ftruncate(fd, size)
+
+
+def _copy_chunk(src_e, dst_e, fds, offset, end, callback):
+    if fds is None:
+        with open(src_e, 'rb') as src_fd, open(dst_e, 'r+b') as dst_fd:
+            src_fd.seek(offset)
+            dst_fd.seek(offset)
+            while offset < end:
+                buf = src_fd.read(min(_COPY_BUFFER_SIZE, end - offset))
+                if not buf:
+                    raise IOError('Source file truncated: {}'.format(u(src_e)))
+                dst_fd.write(buf)
+                offset += len(buf)
+                callback(len(buf))
+        return
+
+    src_fd, dst_fd = fds
+    while offset < end:
+        buf = os.pread(src_fd, min(_COPY_BUFFER_SIZE, end - offset), offset)
+        if not buf:
+            raise IOError('Source file truncated: {}'.format(u(src_e)))
+        view = memoryview(buf)
+        while view:
+            written = os.pwrite(dst_fd, view, offset)
+            view = view[written:]
+            offset += written
+        callback(len(buf))
+
+
+def _copy_chunks(src_e, dst_e, size, chunk_size, workers, callback):
+    """Copy byte ranges concurrently into preallocated @dst_e.  """
+
+    with open(src_e, 'rb') as src_fd, open(dst_e, 'wb') as dst_fd:
+        _preallocate(dst_fd.fileno(), size)
+        fds = ((src_fd.fileno(), dst_fd.fileno())
+               if hasattr(os, 'pread') else None)
+        if fds is None:
+            dst_fd.close()
+        executor = ThreadPoolExecutor(workers)
+        futures = []
+        try:
+            for i in range(0, size, chunk_size):
+                futures.append(executor.submit(
+                    _copy_chunk, src_e, dst_e, fds, i, min(i + chunk_size, size), callback))
+            for i in futures:
+                i.result()
+        finally:
+            for i in futures:
+                i.cancel()
+            executor.shutdown(wait=True)
+
+
+def copy_file(src, dst, callback=None, workers=1, chunk_size=64 * 1024 * 1024):
+    """Copy data and metadata from @src to @dst, same as `shutil.copy2`.
+
+    Data is copied inside kernel with `copy_file_range` or `sendfile` when possible,
+    fallback to buffered copy.
+    When @workers > 1, file larger than @chunk_size is split to byte ranges
+    and copied concurrently with `pread` and `pwrite`,
+    for high latency network share that one stream can not saturate.
+
+    Args:
+        src (path): Source file.
+        dst (path): Destination file, not directory.
+        callback (callable, optional): Defaults to None.
+            Called with byte count after each copied block,
+            may be called from other thread.
+        workers (int, optional): Defaults to 1. Max byte ranges copied at same time.
+        chunk_size (int, optional): Defaults to 64MB. Byte range size.
+
+    Raises:
+        IOError: Copied file size or mtime not same with source.
+    """
+
+    src_e, dst_e = e(src), e(dst)
+    callback = callback or (lambda size: None)
+    size = os.stat(src_e).st_size
+    if workers > 1 and size > chunk_size:
+        _copy_chunks(src_e, dst_e, size, chunk_size, workers, callback)
+        shutil.copystat(src_e, dst_e)
+        if not is_same(src_e, dst_e):
+            raise IOError('Copy verification failed: {} -> {}'.format(
+                u(src_e), u(dst_e)))
+        return
+
+    with open(src_e, 'rb') as src_fd, open(dst_e, 'wb') as dst_fd:
+        copied = _zero_copy(src_fd.fileno(), dst_fd.fileno(), size, callback)
+        src_fd.seek(copied)
+        dst_fd.seek(copied)
+        while True:
+            buf = src_fd.read(_COPY_BUFFER_SIZE)
+            if not buf:
+                break
+            dst_fd.write(buf)
+            callback(len(buf))
+    shutil.copystat(src_e, dst_e)
+
+
+class HTTPConnectionPool(object):
+    """Keep-alive HTTP connections, reused for requests to same host.
+
+    Args:
+        maxsize (int, optional): Defaults to 4. Max idle connections for each host.
+        timeout (float, optional): Defaults to 60. Socket timeout in seconds.
+    """
+
+    def __init__(self, maxsize=4, timeout=60):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self._idle = {}
+        self._lock = _threading.Lock()
+
+    def get(self, scheme, netloc):
+        """Get a connection, reuse idle one when possible.
+
+        Args:
+            scheme (str): `http` or `https`.
+            netloc (str): Host and port.
+
+        Returns:
+            tuple: (connection, is reused)
+        """
+
+        with self._lock:
+            idle = self._idle.get((scheme, netloc))
+            if idle:
+                return idle.pop(), True
+        cls = (http_client.HTTPSConnection if scheme == 'https'
+               else http_client.HTTPConnection)
+        return cls(netloc, timeout=self.timeout), False
+
+    def put(self, scheme, netloc, conn):
+        """Return connection to pool after response fully read.  """
+
+        with self._lock:
+            idle = self._idle.setdefault((scheme, netloc), [])
+            if len(idle) < self.maxsize:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def clear(self):
+        """Close all idle connections.  """
+
+        with self._lock:
+            for conns in self._idle.values():
+                for i in conns:
+                    i.close()
+            self._idle.clear()
+
+
+HTTP_POOL = HTTPConnectionPool()
+
+_HTTP_REDIRECT = (301, 302, 303, 307, 308)
+
+
+def _http_get(url, headers, pool):
+    for _ in range(5):
+        parts = urllib.parse.urlsplit(url)
+        path = urllib.parse.urlunsplit(('', '', parts.path or '/', parts.query, ''))
+        conn, reused = pool.get(parts.scheme, parts.netloc)
+        try:
+            conn.request('GET', path, headers=headers)
+            resp = conn.getresponse()
+        except (http_client.HTTPException, OSError, IOError):
+            conn.close()
+            if not reused:
+                raise
+            # Idle connection closed by server, retry with new one.
+            conn, _ = pool.get(parts.scheme, parts.netloc)
+            conn.request('GET', path, headers=headers)
+            resp = conn.getresponse()
+        if resp.status not in _HTTP_REDIRECT:
+            return parts, conn, resp
+        resp.read()
+        pool.put(parts.scheme, parts.netloc, conn)
+        url = urllib.parse.urljoin(url, resp.getheader('Location'))
+    raise IOError('Too many redirects: {}'.format(url))
+
+
+def _part_validator(resp):
+    etag = resp.getheader('ETag')
+    if etag and not etag.startswith('W/'):
+        return etag
+    return resp.getheader('Last-Modified')
+
+
+def _resume_headers(part):
+    """Offset and request headers for resume @part.
+
+    Resume requires the validator saved from the first response,
+    offset is 0 when @part can not be resumed.
+    """
+
+    try:
+        offset = os.path.getsize(e(part))
+        with open(e(part + '.validator'), 'rb') as f:
+            validator = six.ensure_str(f.read(), 'latin-1')
+    except (OSError, IOError):
+        return 0, {}
+    if not offset or not validator:
+        return 0, {}
+    return offset, {'Range': 'bytes={}-'.format(offset), 'If-Range': validator}
+
+
+def _save_validator(part, resp):
+    validator = _part_validator(resp)
+    if validator:
+        with open(e(part + '.validator'), 'wb') as f:
+            f.write(six.ensure_binary(validator, 'latin-1'))
+    elif os.path.exists(e(part + '.validator')):
+        os.remove(e(part + '.validator'))
+
+
+_RESTART = object()
+
+
+def _receive(resp, url, part, dst, offset, handler, chunk_size):
+    """Write @resp body to @part.
+
+    Returns:
+        int or None: Total size, `_RESTART` when @part not match remote file.
+    """
+
+    if resp.status == 416 and offset:
+        resp.read()
+        if not resp.getheader('Content-Range', '').endswith('/{}'.format(offset)):
+            return _RESTART
+        total = offset
+    elif resp.status == 206 and resp.getheader(
+            'Content-Range', '').startswith('bytes {}-'.format(offset)):
+        total = resp.getheader('Content-Range').rpartition('/')[2]
+        total = int(total) if total.isdigit() else None
+    elif resp.status == 200:
+        # Remote file changed or range ignored, download from start.
+        offset = 0
+        length = resp.getheader('Content-Length')
+        total = int(length) if length and length.isdigit() else None
+        _save_validator(part, resp)
+    else:
+        raise IOError('HTTP {} {}: {}'.format(resp.status, resp.reason, url))
+
+    if offset:
+        LOGGER.debug('断点续传: %s: %d', url, offset)
+
+    # Total is None when server not tell length, handler shows count only.
+    handler = handler or progress_core.DefaultHandler()
+    handler.task_name = '下载'
+    handler.total = total
+    handler.count = offset
+    handler.on_started()
+    try:
+        with open(e(part), 'ab' if offset else 'wb') as f:
+            while True:
+                buf = resp.read(chunk_size)
+                if not buf:
+                    break
+                f.write(buf)
+                handler.step(dst, len(buf))
+    finally:
+        handler.on_finished()
+    return total
+
+
+def download(url, dst, handler=None, pool=None, chunk_size=_COPY_BUFFER_SIZE):
+    """Download @url to @dst with streaming write.
+
+    Data is written to `@dst.part` first, existed part file is resumed
+    with `Range` and `If-Range` request, validator (`ETag` or `Last-Modified`)
+    of first response is saved in `@dst.part.validator`.
+    Download starts over when remote file changed.
+    Connections are reused through @pool.
+
+    Args:
+        url (str): http or https url.
+        dst (path): Destination file.
+        handler (BaseProgressHandler, optional): Defaults to None.
+            Progress handler, progress is measured by downloaded bytes.
+        pool (HTTPConnectionPool, optional): Defaults to None.
+            Connection pool, `HTTP_POOL` when not given.
+        chunk_size (int, optional): Defaults to 1MB. Bytes read at once.
+
+    Raises:
+        IOError: Server response with error.
+
+    Returns:
+        six.text_type: Downloaded file path.
+    """
+
+    url, dst = u(url), u(dst)
+    pool = pool or HTTP_POOL
+    part = dst + '.part'
+    total = _RESTART
+    while total is _RESTART:
+        offset, headers = _resume_headers(part)
+        parts, conn, resp = _http_get(url, headers, pool)
+        try:
+            total = _receive(resp, url, part, dst, offset, handler, chunk_size)
+        except BaseException:
+            conn.close()
+            raise
+        if resp.will_close:
+            conn.close()
+        else:
+            pool.put(parts.scheme, parts.netloc, conn)
+        if total is _RESTART:
+            LOGGER.debug('远程文件已变化, 重新下载: %s', url)
+            os.remove(e(part))
+
+    if total is not None and os.path.getsize(e(part)) != total:
+        raise IOError('Download incomplete: {}'.format(url))
+    if os.path.exists(e(dst)):
+        os.remove(e(dst))
+    os.rename(e(part), e(dst))
+    if os.path.exists(e(part + '.validator')):
+        os.remove(e(part + '.validator'))
+    return dst
+
+
+def _block_size(size):
+    return min(max(int(math.sqrt(size)) // 1024 * 1024, 2048), 128 * 1024)
+
+
+def _accumulate(iterable):
+    total = 0
+    for i in iterable:
+        total += i
+        yield total
+
+
+_accumulate = getattr(itertools, 'accumulate', _accumulate)  # noqa: F811
+_map = six.moves.map  # pylint: disable=invalid-name
+
+
+_ADLER_MOD = 65521
+
+
+def _rolling_weak(data, block_size):
+    """`zlib.adler32` at every offset of @data, computed from prefix sums.
+
+    For block starts at k: A = S[k+n] - S[k],
+    B = (k+n) * A - (T[k+n] - T[k]),
+    S and T are prefix sums of data[i] and i * data[i],
+    checksum is ((n + B) % 65521) << 16 | (1 + A) % 65521.
+
+    Returns:
+        iterator: Checksum for offset 0 to len(@data) - @block_size.
+    """
+
+    data = bytearray(data)
+    size = len(data)
+    sums = [0]
+    sums.extend(_accumulate(data))
+    weighted = [0]
+    weighted.extend(_accumulate(_map(operator.mul, six.moves.range(size), data)))
+    mod = itertools.repeat(_ADLER_MOD)
+    a = list(_map(operator.sub, sums[block_size:], sums[:-block_size]))
+    b = _map(operator.sub,
+             _map(operator.mul, six.moves.range(block_size, size + 1), a),
+             _map(operator.sub, weighted[block_size:], weighted[:-block_size]))
+    b = _map(operator.mod, _map(operator.add, b, itertools.repeat(block_size)), mod)
+    a = _map(operator.mod, _map(operator.add, a, itertools.repeat(1)), mod)
+    return _map(operator.or_, _map(operator.lshift, b, itertools.repeat(16)), a)
+
+
+def _block_signature(data, block_size):
+    """Map weak checksum of each full block to (strong checksum, block index).  """
+
+    ret = {}
+    for index in six.moves.range(len(data) // block_size):
+        block = data[index * block_size:(index + 1) * block_size]
+        ret.setdefault(zlib.adler32(block) & 0xffffffff, []).append(
+            (hashlib.md5(block).digest(), index))
+    return ret
+
+
+def _search_block(src_data, signature, block_size, start, count):
+    """Search first block of @src_data in @signature, from @count offsets after @start.
+
+    Returns:
+        tuple or None: (offset, block index), None when not found.
+    """
+
+    weaks = _rolling_weak(src_data[start:start + count + block_size - 1], block_size)
+    for offset, weak in enumerate(weaks, start):
+        candidates = signature.get(weak)
+        if not candidates:
+            continue
+        strong = hashlib.md5(src_data[offset:offset + block_size]).digest()
+        for i, j in candidates:
+            if i == strong:
+                return offset, j
+    return None
+
+
+def _block_matches(src_data, dst_data, block_size, max_literal):
+    """Find blocks of @dst_data in @src_data like `rsync`.
+
+    Next block of last match is compared directly first,
+    weak checksum only rolls after a mismatch,
+    over a window grows while not found,
+    so cost depends on changed bytes instead of file size.
+
+    Returns:
+        list or None: (offset, block index) of matched blocks,
+            None when literal bytes more than @max_literal.
+    """
+
+    size, ret, literal, pos, index = len(src_data), [], 0, 0, 0
+    blocks = len(dst_data) // block_size
+    signature = None
+    window = block_size
+    while pos + block_size <= size:
+        if (index < blocks
+                and src_data[pos:pos + block_size]
+                == dst_data[index * block_size:(index + 1) * block_size]):
+            ret.append((pos, index))
+            pos += block_size
+            index += 1
+            window = block_size
+            continue
+        if signature is None:
+            signature = _block_signature(dst_data, block_size)
+        count = min(window, size - block_size + 1 - pos)
+        found = _search_block(src_data, signature, block_size, pos, count)
+        if found is None:
+            literal += count
+            pos += count
+            window = min(window * 2, 1024 * 1024)
+        else:
+            literal += found[0] - pos
+            ret.append(found)
+            pos = found[0] + block_size
+            index = found[1] + 1
+        if literal > max_literal:
+            return None
+    if literal + size - pos > max_literal:
+        return None
+    return ret
+
+
+def _is_similar(src_data, dst_data, max_ratio, samples=16, sample_size=64):
+    """Sample @src_data chunks and search in @dst_data, to skip poor delta early.  """
+
+    offsets = [(len(src_data) - sample_size) * i // (samples - 1) for i in range(samples)]
+    found = sum(1 for i in offsets
+                if dst_data.find(src_data[i:i + sample_size]) != -1)
+    return found >= samples * (1 - max_ratio)
+
+
+def _literal_ranges(matches, block_size, size):
+    offset = 0
+    for start, _ in matches:
+        if start > offset:
+            yield offset, start
+        offset = start + block_size
+    if offset < size:
+        yield offset, size
+
+
+def delta_copy(src, dst, block_size=None, max_ratio=0.5):
+    """Update existed @dst to @src, only changed bytes are transferred.
+
+    Blocks of @dst are found in @src with rolling checksum like `rsync`,
+    so inserted or removed bytes only cost the changed bytes.
+    @dst is updated in place when all matched blocks at same offset,
+    otherwise rebuilt to a temporary file beside @dst from its own blocks
+    and changed bytes of @src.
+    Fallback to `copy_file` when @dst not exists or delta is poor.
+
+    Args:
+        src (path): Source file.
+        dst (path): Destination file, not directory.
+        block_size (int, optional): Defaults to None.
+            Block size in bytes, decided by file size when not given.
+        max_ratio (float, optional): Defaults to 0.5.
+            Max ratio of changed bytes to use delta.
+
+    Returns:
+        int: Byte count read from @src and written to @dst,
+            blocks reused from @dst are not counted.
+    """
+
+    src_e, dst_e = e(src), e(dst)
+    size = os.stat(src_e).st_size
+    try:
+        dst_size = os.stat(dst_e).st_size
+    except OSError:
+        dst_size = 0
+    block_size = block_size or _block_size(max(size, dst_size))
+    if size < block_size or dst_size < block_size:
+        copy_file(src_e, dst_e)
+        return size
+
+    ret = None
+    with open(src_e, 'rb') as src_fd, open(dst_e, 'r+b') as dst_fd:
+        src_data = mmap.mmap(src_fd.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            dst_data = mmap.mmap(dst_fd.fileno(), 0, access=mmap.ACCESS_READ)
+            in_place = False
+            try:
+                matches = _block_matches(
+                    src_data, dst_data, block_size, int(size * max_ratio)
+                ) if _is_similar(src_data, dst_data, max_ratio) else None
+                in_place = matches is not None and all(
+                    offset == index * block_size for offset, index in matches)
+                if matches is not None and not in_place:
+                    with open(dst_e + e('.delta'), 'wb') as f:
+                        ret = _rebuild(f, src_data, dst_data, matches, block_size)
+            finally:
+                dst_data.close()
+            if in_place:
+                ret = _write_literals(dst_fd, src_data, matches, block_size)
+                dst_fd.truncate(size)
+        finally:
+            src_data.close()
+
+    if ret is None:
+        LOGGER.debug('Delta is poor, copy full file: %s', src)
+        copy_file(src_e, dst_e)
+        return size
+    if os.path.exists(dst_e + e('.delta')):
+        os.remove(dst_e)
+        os.rename(dst_e + e('.delta'), dst_e)
+    shutil.copystat(src_e, dst_e)
+    LOGGER.debug('Delta copy %d/%d bytes: %s', ret, size, src)
+    return ret
+
+
+def _write_literals(f, src_data, matches, block_size):
+    ret = 0
+    for start, end in _literal_ranges(matches, block_size, len(src_data)):
+        f.seek(start)
+        f.write(src_data[start:end])
+        ret += end - start
+    return ret
+
+
+def _rebuild(f, src_data, dst_data, matches, block_size):
+    ret, offset = 0, 0
+    for start, index in matches:
+        if start > offset:
+            f.write(src_data[offset:start])
+            ret += start - offset
+        f.write(dst_data[index * block_size:(index + 1) * block_size])
+        offset = start + block_size
+    if offset < len(src_data):
+        f.write(src_data[offset:])
+        ret += len(src_data) - offset
+    return ret
+
+
+def _makedirs(path):
+    try:
+        os.makedirs(e(path))
+        LOGGER.debug('创建目录: %s', path)
+    except OSError as ex:
+        if ex.errno != errno.EEXIST or not os.path.isdir(e(path)):
+            raise
+
+
+def _volume(path):
+    drive = os.path.splitdrive(path)[0]
+    if drive:
+        return os.path.normcase(drive)
+    try:
+        return os.stat(e(path)).st_dev
+    except OSError:
+        return None
+
+
+def _file_size(path):
+    try:
+        return os.stat(e(path)).st_size
+    except OSError:
+        return 0
+
+
+def _copy_task(src, dst, size, semaphore, controller, error, callback):
+    if error is not None:
+        raise error
+    if _normalized(src) == _normalized(dst):
+        LOGGER.warning('不能原地复制: %s', src)
+        return dst
+    with semaphore, controller.slot(size):
+        LOGGER.debug('复制: %s -> %s', src, dst)
+        copy_file(src, dst, lambda size: callback((dst, size)))
+    return dst
+
+
+def _finished_copies(executor, futures, events, handler, total):
+    # Each file counts its bytes and one more step when finished.
+    handler = handler or progress_core.DefaultHandler()
+    handler.task_name = '复制文件'
+    handler.total = total + len(futures)
+    handler.on_started()
+    try:
+        remains = len(futures)
+        while remains:
+            event = events.get()
+            if isinstance(event, tuple):
+                handler.step(*event)
+            else:
+                remains -= 1
+                handler.step(futures[event])
+                yield event
+    finally:
+        handler.on_finished()
+        for i in futures:
+            i.cancel()
+        executor.shutdown(wait=True)
+
+
+def copy_many(pairs, workers=8, volume_workers=4, handler=None, controller=None):
+    """Copy files with a bounded thread pool.
+
+    Destination directories are created once for each directory,
+    copies to same destination volume are limited by @volume_workers.
+    Copies start before return, iterate the result to wait for them
+    and report progress, close it to cancel copies not started.
+
+    >>> for future in copy_many(pairs):  # doctest: +SKIP
+    ...     future.result()
+
+    Args:
+        pairs (iterable): (source, destination) file path pairs.
+        workers (int, optional): Defaults to 8. Max copies at same time.
+        volume_workers (int, optional): Defaults to 4.
+            Max copies at same time for one destination volume.
+        handler (BaseProgressHandler, optional): Defaults to None.
+            Progress handler, progress is measured by copied bytes.
+        controller (AIMDController, optional): Defaults to None.
+            Adjust copies at same time by measured throughput,
+            a new one with @workers as maximum when not given.
+
+    Returns:
+        generator: `concurrent.futures.Future` for each pair in finish order,
+            result is destination path.
+    """
+
+    pairs = [(u(src), u(dst)) for src, dst in pairs]
+    if not pairs:
+        return iter(())
+    controller = controller or AIMDController(maximum=workers, metric='throughput')
+    executor = ThreadPoolExecutor(controller.maximum)
+    events = queue.Queue()
+    futures = {}
+    try:
+        sizes = list(executor.map(_file_size, [i[0] for i in pairs]))
+        errors, semaphores, volumes = {}, {}, {}
+        for dirname in set(os.path.dirname(i[1]) for i in pairs):
+            # Empty dirname is current directory, it always exists.
+            if dirname:
+                try:
+                    _makedirs(dirname)
+                except OSError as ex:
+                    errors[dirname] = ex
+            volume = _volume(dirname or os.curdir)
+            if volume not in volumes:
+                volumes[volume] = _threading.BoundedSemaphore(volume_workers)
+            semaphores[dirname] = volumes[volume]
+
+        for (src, dst), size in zip(pairs, sizes):
+            dirname = os.path.dirname(dst)
+            future = executor.submit(
+                _copy_task, src, dst, size, semaphores[dirname], controller,
+                errors.get(dirname), events.put)
+            futures[future] = dst
+            future.add_done_callback(events.put)
+    except BaseException:
+        for i in futures:
+            i.cancel()
+        executor.shutdown(wait=True)
+        raise
+    return _finished_copies(executor, futures, events, handler, sum(sizes))
+
+
+def _is_newer(version, current):
+    return version is not None and (current is None or version > current)
+
+
+def _mtime(path):
+    try:
+        return os.stat(e(path)).st_mtime
+    except OSError:
+        return None
+
+
+def version_filter(iterable, records=False, cls=None, workers=8):
     """Keep only newest version for each shot, try compare mtime when version is same.
 
+    Single pass over @iterable, only current newest items of each shot are kept,
+    then mtime of all version tied items are read in one parallel round.
+
     >>> version_filter(('sc_001_v1', 'sc_001_v2', 'sc002_v3', 'thumbs.db'))
     [u'sc002_v3', u'sc_001_v2', u'thumbs.db']
+
+    Args:
+        iterable (iterable): Paths, can be a generator.
+        records (bool, optional): Defaults to False.
+            Items are pre-parsed records like `wlf.scan.FootageRecord`,
+            use their `shot`, `version` and `mtime` directly.
+        cls (type, optional): Defaults to None. `PurePath` subclass,
+            use its version pattern for parsing.
+        workers (int, optional): Defaults to 8. Max `stat` calls
+            at same time for version tied items.
+
+    Returns:
+        list: Sorted newest items.
     """
+
+    parse = version_parser(cls)
     shots = {}
-    iterable = sorted(
-        iterable, key=lambda x: PurePath(x).version, reverse=True)
     for i in iterable:
-        path = PurePath(i)
-        shot = path.shot.lower()
-        version = path.version
-        shots.setdefault(shot, {})
-        shots[shot].setdefault('path_list', [])
-        if version > shots[shot].get('version'):
-            shots[shot]['path_list'] = [i]
-            shots[shot]['version'] = version
-        elif version == shots[shot].get(version):
-            shots[shot]['path_list'].append(i)
-
-    for shot in shots:
-        shots[shot] = sorted(
-            shots[shot]['path_list'],
-            key=lambda shot:
-            Path(shot).stat().st_mtime if Path(shot).exists() else None,
-            reverse=True)[0]
-    return sorted(shots.values())
+        if records:
+            shot, version = i.shot, i.version
+        else:
+            shot, version = parse(split_name(i)[1])
+        key = (shot or '').lower()
+        current = shots.get(key)
+        if current is None or _is_newer(version, current[0]):
+            shots[key] = (version, [i])
+        elif version == current[0]:
+            current[1].append(i)
+
+    ties = [j for _, items in shots.values() if len(items) > 1 for j in items]
+    if not ties:
+        mtimes = {}
+    elif records:
+        mtimes = {i: i.mtime for i in ties}
+    else:
+        pool = multiprocessing.dummy.Pool(workers)
+        try:
+            mtimes = dict(zip(ties, pool.map(_mtime, ties)))
+        finally:
+            pool.close()
+            pool.join()
+
+    def _newest(items):
+        if len(items) == 1:
+            return items[0]
+        return max(items, key=lambda x: (mtimes[x] is not None, mtimes[x] or 0))
+
+    return sorted(_newest(items) for _, items in shots.values())
 
 
 def map_drivers():
@@ -124,25 +908,236 @@ def map_drivers():
         LOGGER.warning('Map drivers not implemented on this platform.')
 
 
-def checked_exists(checking_list):
-    """Return file existed item in @checking_list.  """
+def _normalized(path):
+    return os.path.normcase(os.path.normpath(u(path)))
 
-    checking_list = set(checking_list)
 
-    def _check(i):
-        if os.path.exists(e(i)):
-            return i
+def _list_names(directory, controller):
+    try:
+        # Errors pass through slot, so congestion shrinks the limit.
+        with controller.slot():
+            return set(os.path.normcase(i.name) for i in os.scandir(directory))
+    except OSError as ex:
+        if ex.errno in (errno.ENOENT, errno.ENOTDIR):
+            return set()
+        LOGGER.debug('Can not list directory, fallback to exists: %s: %s',
+                     directory, ex)
         return None
 
+
+def checked_exists(checking_list, records=None, workers=8, controller=None):
+    """Return file existed item in @checking_list.
+
+    Paths are grouped by parent directory,
+    each directory is listed once instead of checking every file.
+
+    Args:
+        checking_list (iterable): Paths to check.
+        records (iterable, optional): Defaults to None.
+            `wlf.scan.FootageRecord` of scanned files,
+            when given, check with them instead of file system.
+        workers (int, optional): Defaults to 8. Max directories
+            listed at same time.
+        controller (AIMDController, optional): Defaults to None.
+            Adjust directories listed at same time by measured latency,
+            a new one with @workers as maximum when not given.
+
+    Returns:
+        list: Existed paths.
+    """
+
+    checking_list = set(checking_list)
+    if records is not None:
+        known = set(_normalized(i.path) for i in records)
+        return sorted(i for i in checking_list if _normalized(i) in known)
+
+    groups, directories = {}, {}
     ret = set()
-    pool = multiprocessing.dummy.Pool()
-    for i in progress(pool.imap_unordered(_check, checking_list),
-                      '验证文件', total=len(checking_list), start_message=''):
-        if i:
-            ret.add(i)
-    ret = pool.map(_check, checking_list)
-    pool.close()
-    pool.join()
+    for i in checking_list:
+        directory, name = os.path.split(u(i))
+        if name in ('', os.curdir, os.pardir):
+            if os.path.exists(e(i)):
+                ret.add(i)
+            continue
+        try:
+            directory = directories[directory]
+        except KeyError:
+            directory = directories.setdefault(directory, _normalized(directory or os.curdir))
+        groups.setdefault(directory, []).append((os.path.normcase(name), i))
+
+    def _check(directory):
+        names = _list_names(directory, controller)
+        if names is None:
+            with controller.slot():
+                names = set(name for name, i in groups[directory] if os.path.exists(e(i)))
+        for name, i in groups[directory]:
+            if name in names:
+                ret.add(i)
+        return directory
+
+    controller = controller or AIMDController(maximum=workers)
+    pool = multiprocessing.dummy.Pool(controller.maximum)
+    # Progress is measured by paths, one step for each file in checked directory.
+    handler = progress_core.DefaultHandler()
+    handler.task_name = '验证文件'
+    handler.total = len(checking_list)
+    handler.on_started()
+    try:
+        handler.set_message('')
+        checked = len(checking_list) - sum(len(i) for i in groups.values())
+        if checked:
+            handler.step(amount=checked)
+        for directory in pool.imap_unordered(_check, groups):
+            handler.step(directory, len(groups[directory]))
+    finally:
+        handler.on_finished()
+        pool.close()
+        pool.join()
+    return sorted(ret)
+
+
+SyncPlan = namedtuple('SyncPlan', ('copy', 'skip', 'delete'))
+
+
+def _walk_files(root):
+    """Walk @root once, return files and directories keyed by normalized relative path.  """
+
+    files, dirs = {}, {}
+    stack = ['']
+    while stack:
+        rel = stack.pop()
+        try:
+            entries = list(os.scandir(os.path.join(root, rel) if rel else root))
+        except OSError as ex:
+            if ex.errno not in (errno.ENOENT, errno.ENOTDIR):
+                LOGGER.warning('Can not list directory: %s: %s', rel or root, ex)
+            continue
+        for entry in entries:
+            path = os.path.join(rel, entry.name) if rel else entry.name
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    dirs[os.path.normcase(path)] = path
+                    stack.append(path)
+                elif entry.is_file():
+                    stat = entry.stat()
+                    files[os.path.normcase(path)] = (path, stat.st_size, stat.st_mtime)
+            except OSError as ex:
+                LOGGER.warning('Can not stat: %s: %s', entry.path, ex)
+    return files, dirs
+
+
+def sync_plan(src_root, dst_root):
+    """Plan to make @dst_root same as @src_root.
+
+    Each tree is walked once, files are compared by size and mtime
+    from directory listing, same as `is_same`.
+
+    >>> plan = sync_plan('Z:/EP01/Comp', 'E:/EP01/Comp')  # doctest: +SKIP
+    >>> for i in plan.delete:  # doctest: +SKIP
+    ...     (shutil.rmtree if os.path.isdir(i) else os.remove)(i)
+    >>> for future in copy_many(plan.copy):  # doctest: +SKIP
+    ...     future.result()
+
+    Args:
+        src_root (path): Source directory.
+        dst_root (path): Destination directory.
+
+    Returns:
+        SyncPlan: `copy` and `skip` are sorted (source, destination) pairs,
+            `delete` are sorted top most destination files and directories
+            not in source, should be deleted before copy.
+    """
+
+    src_root, dst_root = u(src_root), u(dst_root)
+    executor = ThreadPoolExecutor(2)
+    try:
+        (src_files, src_dirs), (dst_files, dst_dirs) = executor.map(
+            _walk_files, (src_root, dst_root))
+    finally:
+        executor.shutdown()
+
+    plan = SyncPlan([], [], [])
+    for key in sorted(src_files):
+        rel, size, mtime = src_files[key]
+        target = dst_files.get(key)
+        pair = (os.path.join(src_root, rel),
+                os.path.join(dst_root, target[0] if target else rel))
+        if target and target[1] == size and abs(target[2] - mtime) < 1e-4:
+            plan.skip.append(pair)
+        else:
+            plan.copy.append(pair)
+    deleted_dirs = set(i for i in dst_dirs if i not in src_dirs)
+
+    def _is_top(key):
+        parent = os.path.dirname(key)
+        while parent:
+            if parent in deleted_dirs:
+                return False
+            parent = os.path.dirname(parent)
+        return True
+
+    plan.delete.extend(sorted(
+        [os.path.join(dst_root, dst_dirs[i]) for i in deleted_dirs if _is_top(i)]
+        + [os.path.join(dst_root, dst_files[i][0]) for i in dst_files
+           if i not in src_files and _is_top(i)]))
+    return plan
+
+
+def write_manifest(root, manifest, cache=None):
+    """Write content hash of all files under @root to @manifest.
+
+    Each line is `<hex digest>  <relative path>`, same as `sha1sum`.
+
+    Args:
+        root (path): Root directory.
+        manifest (path): Manifest file, excluded when under @root.
+        cache (HashCache, optional): Defaults to None.
+            Hash cache, unchanged files will not be read again.
+
+    Returns:
+        int: File count.
+    """
+
+    root, manifest = u(root), u(manifest)
+    files, _ = _walk_files(root)
+    excluded = os.path.normcase(os.path.relpath(manifest, root))
+    names = sorted(v[0] for k, v in files.items() if k != excluded)
+    cache = cache or HashCache()
+    digests = dict(cache.hash_many([os.path.join(root, i) for i in names]))
+    with io.open(e(manifest), 'w', encoding='utf-8', newline='\n') as f:
+        for i in names:
+            f.write('{}  {}\n'.format(digests[os.path.join(root, i)],
+                                       i.replace(os.sep, '/')))
+    return len(names)
+
+
+def verify_manifest(manifest, root=None, cache=None):
+    """Verify files listed in @manifest.
+
+    Args:
+        manifest (path): Manifest file from `write_manifest`.
+        root (path, optional): Defaults to None.
+            Root directory, manifest directory when not given.
+        cache (HashCache, optional): Defaults to None.
+            Hash cache, unchanged files will not be read again.
+
+    Returns:
+        list: Missing or changed file paths, empty when all verified.
+    """
+
+    manifest = u(manifest)
+    root = u(root) if root else os.path.dirname(manifest)
+    expected = {}
+    with io.open(e(manifest), encoding='utf-8') as f:
+        for line in f:
+            digest, _, name = line.rstrip('\r\n').partition('  ')
+            if name:
+                expected[os.path.join(root, *name.split('/'))] = digest
+    existed = checked_exists(expected)
+    cache = cache or HashCache()
+    ret = set(expected).difference(existed)
+    ret.update(path for path, digest in cache.hash_many(existed)
+               if digest != expected[path])
     return sorted(ret)
 
 
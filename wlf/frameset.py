@@ -0,0 +1,331 @@
+# -*- coding=UTF-8 -*-
+"""Frame number set stored as sorted runs.  """
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import heapq
+import re
+from array import array
+from bisect import bisect_right
+from itertools import islice
+
+import six
+
+_RANGE_PATTERN = re.compile(r'^(-?\d+)(?:-(-?\d+)(?:x(\d+))?)?$')
+
+
+def _merge_intervals(intervals):
+    current = None
+    for start, end in intervals:
+        if current is not None and start <= current[1] + 1:
+            current = (current[0], max(current[1], end))
+            continue
+        if current is not None:
+            yield current
+        current = (start, end)
+    if current is not None:
+        yield current
+
+
+def _pending_runs(first, last, step, count):
+    if count >= 3:
+        yield first, last, step
+    elif count:
+        yield first, first, 1
+        if count == 2:
+            yield last, last, 1
+
+
+def _runs_from_intervals(intervals):
+    """(start, end, step) runs from sorted intervals.
+
+    Three or more single frames with same step are stored as one run,
+    everything else is a contiguous run with step 1.
+    """
+
+    first = last = step = None
+    count = 0
+    for start, end in _merge_intervals(intervals):
+        if start == end:
+            if count == 1 or (count >= 2 and start - last == step):
+                step = start - first if count == 1 else step
+                last = start
+                count += 1
+                continue
+            if count == 2:
+                # Same as string form, start over from second frame.
+                yield first, first, 1
+                first, last, step = last, start, start - last
+                continue
+        for i in _pending_runs(first, last, step, count):
+            yield i
+        if start == end:
+            first = last = start
+            count = 1
+        else:
+            count = 0
+            yield start, end, 1
+    for i in _pending_runs(first, last, step, count):
+        yield i
+
+
+@six.python_2_unicode_compatible
+class FrameSet(object):
+    """Set of frame numbers, stored as sorted runs.
+
+    A run is a contiguous interval or single frames with same step,
+    so memory use scales with count of runs instead of count of frames.
+    Added frames are buffered and merged once when the set is read.
+
+    >>> frames = FrameSet.parse('1-100x2,105,110-200')
+    >>> 3 in frames, 4 in frames
+    (True, False)
+    >>> six.text_type(frames - FrameSet.parse('150-300'))
+    u'1-99x2,105,110-149'
+
+    Args:
+        frames (iterable, optional): Defaults to (). Frame numbers.
+    """
+
+    __hash__ = None
+
+    def __init__(self, frames=()):
+        self._starts = array('l')
+        self._ends = array('l')
+        self._steps = array('l')
+        self._added = []
+        if isinstance(frames, FrameSet):
+            self._assign(frames._arrays())  # pylint: disable=protected-access
+        else:
+            self._added.extend(frames)
+
+    def _assign(self, runs):
+        starts, ends, steps = array('l'), array('l'), array('l')
+        for start, end, step in runs:
+            starts.append(start)
+            ends.append(end)
+            steps.append(step)
+        self._starts, self._ends, self._steps = starts, ends, steps
+
+    def _arrays(self):
+        if self._added:
+            added = sorted(set(self._added))
+            self._added = []
+            self._assign(_runs_from_intervals(heapq.merge(
+                self._intervals(), ((i, i) for i in added))))
+        return zip(self._starts, self._ends, self._steps)
+
+    def _intervals(self):
+        for start, end, step in zip(self._starts, self._ends, self._steps):
+            if step == 1:
+                yield start, end
+            else:
+                for i in six.moves.range(start, end + 1, step):
+                    yield i, i
+
+    @classmethod
+    def from_intervals(cls, intervals):
+        """Create from sorted intervals, overlapped intervals are merged.
+
+        Args:
+            intervals (iterable): (start, end) pairs, end is included.
+
+        Returns:
+            FrameSet: Created frame set.
+        """
+
+        ret = cls()
+        ret._assign(_runs_from_intervals(intervals))  # pylint: disable=protected-access
+        return ret
+
+    @classmethod
+    def from_range(cls, start, end, step=1):
+        """Create from frame range.
+
+        Args:
+            start (int): First frame.
+            end (int): Last frame, included.
+            step (int, optional): Defaults to 1. Frame step.
+
+        Returns:
+            FrameSet: Created frame set.
+        """
+
+        if step < 1:
+            raise ValueError('Frame step must be positive: {}'.format(step))
+        if step == 1:
+            return cls.from_intervals(((start, end),) if start <= end else ())
+        last = start + (end - start) // step * step
+        if last - start < 2 * step:
+            return cls.from_intervals(
+                (i, i) for i in six.moves.range(start, end + 1, step))
+        ret = cls()
+        ret._assign(((start, last, step),))  # pylint: disable=protected-access
+        return ret
+
+    @classmethod
+    def parse(cls, text):
+        """Parse frame ranges text like `1-100x2,105,110-200`.
+
+        Args:
+            text (six.text_type): Frame ranges text.
+
+        Raises:
+            ValueError: Can not parse text.
+
+        Returns:
+            FrameSet: Parsed frame set.
+        """
+
+        parts = []
+        for part in text.split(','):
+            part = part.strip()
+            if not part:
+                continue
+            match = _RANGE_PATTERN.match(part)
+            if not match:
+                raise ValueError('Can not parse frame range: {}'.format(part))
+            start = int(match.group(1))
+            end = int(match.group(2) or start)
+            if end < start:
+                raise ValueError('Reversed frame range: {}'.format(part))
+            parts.append(cls.from_range(start, end, int(match.group(3) or 1)))
+        return cls.from_intervals(heapq.merge(*(i.intervals() for i in parts)))
+
+    def intervals(self):
+        """Sorted (start, end) pairs, end is included.
+
+        Returns:
+            generator: Intervals, stepped run gives one pair per frame.
+        """
+
+        self._arrays()
+        return self._intervals()
+
+    def runs(self):
+        """Sorted (start, end, step) runs, end is included.
+
+        Returns:
+            list: Runs as stored.
+        """
+
+        return list(self._arrays())
+
+    @property
+    def first(self):
+        """First frame, None when empty.  """
+
+        self._arrays()
+        return self._starts[0] if self._starts else None
+
+    @property
+    def last(self):
+        """Last frame, None when empty.  """
+
+        self._arrays()
+        return self._ends[-1] if self._ends else None
+
+    def add(self, frame):
+        """Add a frame, costs O(1) in any order.
+
+        Args:
+            frame (int): Frame number.
+        """
+
+        self._added.append(frame)
+
+    def update(self, other):
+        """Add all frames from @other.
+
+        Args:
+            other (iterable): Frame numbers or another `FrameSet`.
+        """
+
+        if not isinstance(other, FrameSet):
+            self._added.extend(other)
+            return
+        result = self | other
+        self._starts, self._ends, self._steps = (
+            result._starts, result._ends, result._steps)  # pylint: disable=protected-access
+
+    def gaps(self):
+        """Frames missing between first and last frame.
+
+        Returns:
+            FrameSet: Missing frames.
+        """
+
+        intervals = list(self.intervals())
+        return FrameSet.from_intervals(
+            (prev[1] + 1, i[0] - 1)
+            for prev, i in zip(intervals, islice(intervals, 1, None)))
+
+    def __contains__(self, frame):
+        self._arrays()
+        index = bisect_right(self._starts, frame) - 1
+        return (index >= 0 and frame <= self._ends[index]
+                and (frame - self._starts[index]) % self._steps[index] == 0)
+
+    def __iter__(self):
+        for start, end, step in self._arrays():
+            for i in six.moves.range(start, end + 1, step):
+                yield i
+
+    def __len__(self):
+        return sum((end - start) // step + 1
+                   for start, end, step in self._arrays())
+
+    def __bool__(self):
+        self._arrays()
+        return bool(self._starts)
+
+    __nonzero__ = __bool__
+
+    def __eq__(self, other):
+        if not isinstance(other, FrameSet):
+            return NotImplemented
+        return list(self._arrays()) == list(other._arrays())  # pylint: disable=protected-access
+
+    def __ne__(self, other):
+        ret = self.__eq__(other)
+        return ret if ret is NotImplemented else not ret
+
+    def __or__(self, other):
+        return FrameSet.from_intervals(
+            heapq.merge(self.intervals(), other.intervals()))
+
+    def __sub__(self, other):
+        ret = []
+        other_intervals = list(other.intervals())
+        index = 0
+        for start, end in self.intervals():
+            while index < len(other_intervals) and other_intervals[index][1] < start:
+                index += 1
+            i = index
+            while i < len(other_intervals) and other_intervals[i][0] <= end:
+                other_start, other_end = other_intervals[i]
+                if other_start > start:
+                    ret.append((start, other_start - 1))
+                start = max(start, other_end + 1)
+                i += 1
+            if start <= end:
+                ret.append((start, end))
+        return FrameSet.from_intervals(ret)
+
+    def __and__(self, other):
+        return self - (self - other)
+
+    def __repr__(self):
+        return 'FrameSet({!r})'.format(six.text_type(self))
+
+    def __str__(self):
+        ret = []
+        for start, end, step in self._arrays():
+            if start == end:
+                ret.append('{}'.format(start))
+            elif step == 1:
+                ret.append('{}-{}'.format(start, end))
+            else:
+                ret.append('{}-{}x{}'.format(start, end, step))
+        return ','.join(ret)
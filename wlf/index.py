@@ -0,0 +1,257 @@
+# -*- coding=UTF-8 -*-
+"""Persistent footage metadata index with incremental refresh.  """
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import errno
+import logging
+import multiprocessing.dummy
+import os
+import sqlite3
+
+from .codectools import get_unicode as u
+from .path import footage_parser
+from .scan import FootageRecord, list_dir
+
+LOGGER = logging.getLogger('com.wlf.index')
+
+_SCHEMA_VERSION = 1
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS directories (
+    path TEXT PRIMARY KEY,
+    parent TEXT,
+    mtime REAL
+);
+CREATE INDEX IF NOT EXISTS directories_parent ON directories (parent);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    directory TEXT,
+    size INTEGER,
+    mtime REAL,
+    shot TEXT,
+    version INTEGER,
+    tag TEXT
+);
+CREATE INDEX IF NOT EXISTS files_directory ON files (directory);
+CREATE INDEX IF NOT EXISTS files_shot ON files (shot COLLATE NOCASE, version);
+CREATE INDEX IF NOT EXISTS files_tag ON files (tag);
+'''
+_RECORD_COLUMNS = 'path, size, mtime, shot, version, tag'
+_REMOVED_ERRNOS = (errno.ENOENT, errno.ENOTDIR)
+
+
+def _check_dir(args):
+    """Check directory for refresh.
+
+    Returns:
+        tuple: (path, mtime, listing), mtime is None when removed,
+            listing is None when not changed, an `OSError` when can not list.
+    """
+
+    path, stored_mtime, parse = args
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError as ex:
+        if ex.errno in _REMOVED_ERRNOS:
+            return path, None, None
+        return path, stored_mtime, ex
+    if mtime == stored_mtime:
+        return path, mtime, None
+    try:
+        return path, mtime, list_dir(path, parse)
+    except OSError as ex:
+        return path, mtime, ex
+
+
+def _prefix(path):
+    return path if path.endswith(os.sep) else path + os.sep
+
+
+class FootageIndex(object):
+    """On-disk index of file size, mtime and parsed footage fields.
+
+    Refresh only lists directories whose mtime changed,
+    unchanged directories cost one `stat` call.
+    File modified in place does not change its directory mtime,
+    use `refresh(root, full=True)` when that matters.
+
+    Args:
+        filename (str): SQLite database file, `:memory:` for temporary index.
+        cls (type, optional): Defaults to None. `PurePath` subclass,
+            use its patterns for parsing.
+        workers (int, optional): Defaults to 8. Max directories
+            checked at same time.
+    """
+
+    def __init__(self, filename, cls=None, workers=8):
+        self.cls = cls
+        self.workers = workers
+        self._conn = sqlite3.connect(u(filename))
+        if self._conn.execute('PRAGMA user_version').fetchone()[0] != _SCHEMA_VERSION:
+            self._conn.executescript(_SCHEMA)
+            self._conn.execute('PRAGMA user_version = {}'.format(_SCHEMA_VERSION))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self):
+        """Close database.  """
+
+        self._conn.close()
+
+    @staticmethod
+    def _under(column, root):
+        if root is None:
+            return '1', ()
+        root = os.path.normpath(u(root))
+        prefix = _prefix(root)
+        return ('({0} = ? OR substr({0}, 1, ?) = ?)'.format(column),
+                (root, len(prefix), prefix))
+
+    def _remove_tree(self, path):
+        for table, column in (('files', 'directory'), ('directories', 'path')):
+            where, params = self._under(column, path)
+            self._conn.execute(
+                'DELETE FROM {} WHERE {}'.format(table, where), params)
+
+    def refresh(self, root, full=False):
+        """Update index for files under @root.
+
+        Args:
+            root (path): Root directory.
+            full (bool, optional): Defaults to False.
+                Rescan all directories even not changed.
+
+        Returns:
+            int: Rescanned directory count.
+        """
+
+        root = os.path.normpath(u(root))
+        where, params = self._under('path', root)
+        stored, children = {}, {}
+        for path, parent, mtime in self._conn.execute(
+                'SELECT path, parent, mtime FROM directories WHERE ' + where, params):
+            stored[path] = None if full else mtime
+            children.setdefault(parent, []).append(path)
+
+        parse = footage_parser(self.cls)
+        ret = 0
+        level = [root]
+        pool = multiprocessing.dummy.Pool(self.workers)
+        try:
+            with self._conn:
+                while level:
+                    next_level = []
+                    for path, mtime, listing in pool.imap_unordered(
+                            _check_dir, [(i, stored.get(i), parse) for i in level]):
+                        if mtime is None:
+                            self._remove_tree(path)
+                        elif listing is None:
+                            next_level.extend(children.get(path, ()))
+                        elif isinstance(listing, OSError):
+                            # Keep old records and mtime, so retry on next refresh.
+                            LOGGER.warning('Can not check directory: %s: %s', path, listing)
+                            next_level.extend(children.get(path, ()))
+                        else:
+                            self._update_dir(path, mtime, listing,
+                                             children.get(path, ()))
+                            next_level.extend(listing[1])
+                            ret += 1
+                    level = next_level
+        finally:
+            pool.close()
+            pool.join()
+        LOGGER.debug('Rescanned %d directories: %s', ret, root)
+        return ret
+
+    def _update_dir(self, path, mtime, listing, old_dirs):
+        records, dirs = listing
+        for i in set(old_dirs).difference(dirs):
+            self._remove_tree(i)
+        self._conn.execute('DELETE FROM files WHERE directory = ?', (path,))
+        self._conn.executemany(
+            'INSERT INTO files (path, directory, size, mtime, shot, version, tag) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            ((i.path, path, i.size, i.mtime, i.shot, i.version, i.tag)
+             for i in records))
+        self._conn.execute(
+            'INSERT OR REPLACE INTO directories (path, parent, mtime) VALUES (?, ?, ?)',
+            (path, os.path.dirname(path), mtime))
+
+    def _records(self, sql, params=()):
+        return [FootageRecord(*i) for i in self._conn.execute(sql, params)]
+
+    def get(self, path):
+        """Get indexed record for @path.
+
+        Args:
+            path (path): File path.
+
+        Returns:
+            FootageRecord or None: Record, None when not indexed.
+        """
+
+        ret = self._records(
+            'SELECT {} FROM files WHERE path = ?'.format(_RECORD_COLUMNS),
+            (os.path.normpath(u(path)),))
+        return ret[0] if ret else None
+
+    def files(self, root=None):
+        """All indexed files.
+
+        Args:
+            root (path, optional): Defaults to None.
+                Only files under this directory.
+
+        Returns:
+            list: `FootageRecord` sorted by path.
+        """
+
+        where, params = self._under('directory', root)
+        return self._records(
+            'SELECT {} FROM files WHERE {} ORDER BY path'.format(
+                _RECORD_COLUMNS, where), params)
+
+    def files_of_tag(self, tag, root=None):
+        """All indexed files with footage tag @tag.
+
+        Args:
+            tag (six.text_type): Footage tag.
+            root (path, optional): Defaults to None.
+                Only files under this directory.
+
+        Returns:
+            list: `FootageRecord` sorted by path.
+        """
+
+        where, params = self._under('directory', root)
+        return self._records(
+            'SELECT {} FROM files WHERE tag = ? AND {} ORDER BY path'.format(
+                _RECORD_COLUMNS, where), (u(tag),) + params)
+
+    def latest_versions(self, root=None):
+        """Files of the latest version for each shot.
+
+        Shot is case insensitive, files without version are ignored.
+
+        Args:
+            root (path, optional): Defaults to None.
+                Only files under this directory.
+
+        Returns:
+            list: `FootageRecord` sorted by path.
+        """
+
+        where, params = self._under('directory', root)
+        return self._records(
+            'SELECT {0} FROM files JOIN ('
+            'SELECT shot AS latest_shot, max(version) AS latest_version '
+            'FROM files WHERE version IS NOT NULL AND {1} '
+            'GROUP BY shot COLLATE NOCASE) '
+            'ON shot = latest_shot COLLATE NOCASE AND version = latest_version '
+            'WHERE {1} ORDER BY path'.format(_RECORD_COLUMNS, where),
+            params * 2)
@@ -6,15 +6,19 @@ from __future__ import print_function, unicode_literals
 import io
 import json
 import logging
+import multiprocessing
 import os
 import re
 import string
 import sys
+import weakref
+from array import array
+from collections import deque, namedtuple
 from functools import wraps
 
 import six
 
-from .codectools import get_encoded, get_unicode
+from .codectools import decode_path, get_encoded, get_unicode
 from .pathtools import module_path
 
 if six.PY2:
@@ -22,6 +26,11 @@ if six.PY2:
 else:
     import pathlib  # pylint: disable=import-error
 
+try:
+    from functools import lru_cache
+except ImportError:
+    from backports.functools_lru_cache import lru_cache  # pylint: disable=import-error
+
 with pathlib.Path(module_path('data', 'files.tags.json')).open(encoding='utf-8') as _f:
     _TAGS = json.load(_f)
     REGULAR_TAGS = _TAGS['regular_tags']
@@ -31,12 +40,308 @@ with pathlib.Path(module_path('data', 'files.tags.json')).open(encoding='utf-8')
 del _TAGS, _f
 
 LOGGER = logging.getLogger('com.wlf.path')
+_DIGITS = tuple(string.digits)
 
 
 def is_regular_tag(tag):
     """Check if @tag is a regular tag.  """
 
-    return any(tag.startswith(i) for i in REGULAR_TAGS)
+    return tag.startswith(tuple(REGULAR_TAGS))
+
+
+class TagResolver(object):
+    """Resolve footage tag with precompiled patterns and cached results.
+
+    Args:
+        pattern (str): Default tag pattern, first group is the tag.
+        regular_tags (list): Prefixes of regular tags.
+        convert_dict (dict): Tag convert dictionary.
+        default (str): Tag for footage that no pattern matched.
+        maxsize (int, optional): Defaults to 65536. Max cached results.
+    """
+
+    def __init__(self, pattern, regular_tags, convert_dict, default,
+                 maxsize=65536):
+        self.pattern = pattern
+        self.regular_tags = tuple(regular_tags)
+        self.convert_dict = dict(convert_dict)
+        self.default = default
+        self._patterns = {}
+        self._cached_resolve = lru_cache(maxsize)(self._resolve)
+        self._cached_resolve_parent = lru_cache(maxsize)(self._resolve_parent)
+
+    def compiled(self, pattern=None):
+        """Compiled patterns to test in order for @pattern.
+
+        Args:
+            pattern (str, optional): Defaults to None. Custom tag pattern.
+
+        Returns:
+            tuple: Compiled regular expressions.
+        """
+
+        pattern = pattern or self.pattern
+        try:
+            return self._patterns[pattern]
+        except KeyError:
+            ret = tuple(re.compile(i, flags=re.I)
+                        for i in ((pattern,) if pattern == self.pattern
+                                  else (pattern, self.pattern)))
+            self._patterns[pattern] = ret
+            return ret
+
+    def resolve(self, parent_name, name, pattern=None, default=None):
+        """Resolve tag from names, result is cached.
+
+        Args:
+            parent_name (six.text_type): Parent directory name.
+            name (six.text_type): File name.
+            pattern (str, optional): Defaults to None. Custom tag pattern.
+            default (str, optional): Defaults to None. Custom default tag.
+
+        Returns:
+            six.text_type: Footage tag.
+        """
+
+        pattern = pattern or self.pattern
+        # Parent directory decides the tag when first pattern matched it,
+        # so frames of a sequence share one cached result.
+        ret = self._cached_resolve_parent(parent_name, pattern)
+        if ret is None:
+            ret = self._cached_resolve(parent_name, name, pattern,
+                                       default or self.default)
+        return ret
+
+    def _resolve_parent(self, parent_name, pattern):
+        match = self.compiled(pattern)[0].match(parent_name)
+        ret = match and match.group(1) and match.group(1).strip('_').upper()
+        if not ret:
+            return None
+        return self._normalize(ret, parent_name, '')
+
+    def _resolve(self, parent_name, name, pattern, default):
+        ret = None
+        for tag_pat in self.compiled(pattern):
+            for test_string in (parent_name, name):
+                match = tag_pat.match(test_string)
+                if match and match.group(1):
+                    ret = match.group(1).strip('_').upper()
+                    break
+            if ret:
+                break
+        else:
+            return self._normalize(default, parent_name, name, check=False)
+        return self._normalize(ret, parent_name, name)
+
+    def _normalize(self, ret, parent_name, name, check=True):
+        if check and not ret.startswith(self.regular_tags):
+            LOGGER.warning('不规范标签: %s: %s/%s',
+                           ret, parent_name, name)
+
+        if ret in self.convert_dict:
+            ret = self.convert_dict[ret]
+        else:
+            ret = '_'.join(ret.split('_')[:2])
+            ret = self.convert_dict.get(ret, ret)
+
+        if ret.startswith(_DIGITS):
+            ret = '_{}'.format(ret)
+        return get_unicode(ret)
+
+    def resolve_path(self, path, pattern=None, default=None):
+        """Resolve tag for @path.
+
+        Args:
+            path (path-like): Footage path, string will not be
+                converted to path object.
+            pattern (str, optional): Defaults to None. Custom tag pattern.
+            default (str, optional): Defaults to None. Custom default tag.
+
+        Returns:
+            six.text_type: Footage tag.
+        """
+
+        parent_name, name = split_name(path)
+        return self.resolve(parent_name, name, pattern, default)
+
+
+TAG_RESOLVER = TagResolver(TAG_PATTERN, REGULAR_TAGS,
+                           TAG_CONVERT_DICT, DEFAULT_TAG)
+
+
+def split_name(path):
+    """Split @path to parent directory name and name,
+        without construct path object.
+
+    >>> split_name('Z:/MT/Render/MT_BG_co/MT_BG_co.0001.exr')
+    (u'MT_BG_co', u'MT_BG_co.0001.exr')
+    >>> split_name('MT_BG_co.0001.exr')
+    (u'', u'MT_BG_co.0001.exr')
+    >>> split_name('/MT_BG_co/')
+    (u'', u'MT_BG_co')
+
+    Args:
+        path (path-like): Path to split.
+
+    Returns:
+        tuple: (parent name, name)
+    """
+
+    if isinstance(path, pathlib.PurePath):
+        return get_unicode(path.parent.name), get_unicode(path.name)
+
+    if not isinstance(path, six.text_type):
+        path = get_unicode(path)
+    _, path = os.path.splitdrive(path)
+    if os.altsep:
+        path = path.replace(os.altsep, os.sep)
+    parts = path.rstrip(os.sep).rsplit(os.sep, 2)[-2:]
+    if '' in parts or '.' in parts:
+        parts = [i for i in path.split(os.sep) if i and i != '.'][-2:]
+    if not parts:
+        return '', ''
+    if len(parts) == 1:
+        return '', parts[0]
+    return parts[0], parts[1]
+
+
+def resolve_tags(paths, pattern=None, default=None, resolver=None):
+    """Resolve tag for many footages at once.
+
+    >>> resolve_tags(['Z:/MT/Render/image/MT_BG_co/MT_BG_co_Z/Z.001.exr',
+    ...               'Z:/EP13_09_sc151_CH_B/EP13_09_sc151_CH_B.0015.exr'])
+    [u'BG', u'CH_B']
+
+    Args:
+        paths (iterable): Footage paths.
+        pattern (str, optional): Defaults to None. Custom tag pattern.
+        default (str, optional): Defaults to None. Custom default tag.
+        resolver (TagResolver, optional): Defaults to None.
+            Use `TAG_RESOLVER` when not given.
+
+    Returns:
+        list: Tag for each path, in same order.
+    """
+
+    resolver = resolver or TAG_RESOLVER
+    resolve = resolver.resolve
+    return [resolve(parent_name, name, pattern, default)
+            for parent_name, name in (split_name(i) for i in paths)]
+
+
+def get_layers(*presets):
+    """Get layer names from renderer presets.
+
+    >>> get_layers('arnold')[:2]
+    [u'indirect_diffuse', u'direct_diffuse']
+    >>> len(get_layers('redshift', 'arnold'))
+    34
+
+    Args:
+        *presets (str): Preset names like `redshift` or `arnold`,
+            layers of multiple presets are merged in order.
+
+    Returns:
+        list: Layer names.
+    """
+
+    ret = []
+    for preset in presets:
+        filename = module_path('data', 'precomp.{}.json'.format(preset))
+        with pathlib.Path(filename).open(encoding='utf-8') as f:
+            for i in json.load(f).get('layers', []):
+                if i not in ret:
+                    ret.append(i)
+    return ret
+
+
+class LayerMatcher(object):
+    """Find layer name with one combined pattern for a layer set.
+
+    When multiple layers found in a name,
+    the one come first in @layers is used.
+
+    Args:
+        layers (iterable): Layer names.
+    """
+
+    def __init__(self, layers):
+        self.layers = tuple(layers)
+        self._priority = {}
+        for index, layer in enumerate(self.layers):
+            self._priority.setdefault(layer, index)
+        self._pattern = re.compile(r'\b(({})\d*)\b'.format(
+            '|'.join(re.escape(i) for i in self.layers))) if self.layers else None
+
+    def match(self, name):
+        """Find layer in @name.
+
+        >>> LayerMatcher(['Z', 'P']).match('P.Z1.001.exr')
+        u'Z1'
+        >>> LayerMatcher(['Z', 'P']).match('sc_001_BG.001.exr')
+
+        Args:
+            name (six.text_type): File name.
+
+        Returns:
+            six.text_type or None: Layer name with number suffix.
+        """
+
+        if self._pattern is None:
+            return None
+
+        ret, ret_index = None, None
+        for match in self._pattern.finditer(name):
+            index = self._priority[match.group(2)]
+            if ret_index is None or index < ret_index:
+                ret, ret_index = match.group(1), index
+                if index == 0:
+                    break
+        return None if ret is None else get_unicode(ret)
+
+
+_LAYER_MATCHERS = {}
+
+
+def layer_matcher(layers):
+    """Get cached `LayerMatcher` for @layers.
+
+    Args:
+        layers (iterable): Layer names.
+
+    Returns:
+        LayerMatcher: Matcher for this layer set.
+    """
+
+    key = tuple(layers)
+    try:
+        return _LAYER_MATCHERS[key]
+    except KeyError:
+        ret = _LAYER_MATCHERS[key] = LayerMatcher(key)
+        return ret
+
+
+_FRAME_PATTERN = re.compile(r'\.(\d+)\b')
+_FRAME_MARK_PATTERNS = (
+    _FRAME_PATTERN,
+    re.compile(r'\.#+(?=\.)'),
+    re.compile(r'\.%0?\d*d\b'),
+)
+
+
+def _split_suffix(name):
+    """Split @name to stem and suffix, same as `pathlib`.  """
+
+    i = name.rfind('.')
+    if 0 < i < len(name) - 1:
+        return name[:i], name[i:]
+    return name, ''
+
+
+def _footage_name(name):
+    for pat in _FRAME_MARK_PATTERNS:
+        name = pat.sub('', name)
+    return _split_suffix(name)[0]
 
 
 def escape_batch(text):
@@ -84,11 +389,10 @@ class PurePath(pathlib.PurePath):
     """Optimized pathlib.PurePath object for footages.  """
 
     tag_pattern = None
+    tag_resolver = TAG_RESOLVER
     version_pattern = r'(.+)v(\d+)'
     default_tag = DEFAULT_TAG
-    with pathlib.Path(module_path('data', 'precomp.redshift.json')).open(encoding='utf-8') as f:
-        layers = json.load(f).get('layers')
-    _unicode = None
+    layers = get_layers('redshift')
 
     def __new__(cls, *args):
         """Construct a PurePath from one or several strings and or existing
@@ -101,26 +405,88 @@ class PurePath(pathlib.PurePath):
             cls = PureWindowsPath if os.name == 'nt' else PurePosixPath
         args_u = []
         for i in args:
-            if isinstance(i, str):
-                i = get_unicode(i)
+            if isinstance(i, six.binary_type):
+                i = decode_path(i)
             args_u.append(i)
         return cls._from_parts(args_u)
 
+    @classmethod
+    def from_str(cls, text):
+        """Construct from a single text, skip argument decoding.
+
+        >>> PurePath.from_str('sc_001_v20.nk') == PurePath('sc_001_v20.nk')
+        True
+
+        Args:
+            text (six.text_type): Path text.
+
+        Returns:
+            PurePath: Path object.
+        """
+
+        if cls is PurePath:
+            cls = PureWindowsPath if os.name == 'nt' else PurePosixPath
+        elif issubclass(cls, pathlib.Path):
+            return cls(text)
+        if six.PY2:
+            # Parts need to be encoded by `_py2_fsencode`.
+            return cls._from_parts((text,))
+        drv, root, parts = getattr(cls, '_flavour').parse_parts((text,))
+        return cls._from_parsed_parts(drv, root, parts)
+
+    @classmethod
+    def interned(cls, text):
+        """Get path from `PATH_POOL`, same path gives same object.
+
+        Path objects are immutable, so share one object is safe,
+        and memoized properties are shared too.
+
+        >>> PurePath.interned('a//b') is PurePath.interned('a/b')
+        True
+
+        Args:
+            text (six.text_type): Path text.
+
+        Returns:
+            PurePath: Interned path object.
+        """
+
+        if cls is PurePath:
+            cls = PureWindowsPath if os.name == 'nt' else PurePosixPath
+        if not isinstance(text, six.text_type):
+            text = decode_path(text)
+        return PATH_POOL.get(cls, text)
+
     def __str__(self):
         """Return the string representation of the path, suitable for
         passing to system calls."""
 
-        if self._unicode is None:
+        ret = getattr(self, '_unicode', None)
+        if ret is None:
             setattr(self, '_parts',
-                    list(get_unicode(i) if isinstance(i, str) else i
+                    list(get_unicode(i) if isinstance(i, six.binary_type) else i
                          for i in self._parts))
             setattr(self, '_drv', get_unicode(self._drv))
             setattr(self, '_root', get_unicode(self._root))
-            self._unicode = self._format_parsed_parts(
+            ret = self._format_parsed_parts(
                 get_unicode(self._drv),
                 get_unicode(self._root),
                 self._parts) or '.'
-        return self._unicode
+            setattr(self, '_unicode', ret)
+        return ret
+
+    def _memoized(self, name, key, func):
+        """Get value from memo attribute @name, call @func when @key changed.
+
+        @key should contain all class attributes that affect the value,
+        so overriding them takes effect.
+        """
+
+        memo = getattr(self, name, None)
+        if memo is None or memo[0] != key:
+            memo = (key, func())
+            setattr(self, name, memo)
+        return memo[1]
 
     @property
     def name(self):
@@ -132,17 +498,22 @@ class PurePath(pathlib.PurePath):
 
         >>> PurePath('Z:/MT/Render/image/MT_BG_co/MT_BG_co_PuzzleMatte1/PuzzleMatte1.001.exr').layer
         u'PuzzleMatte1'
+
+        Use other renderer preset:
+
+        >>> class ArnoldPath(PurePosixPath):
+        ...     layers = get_layers('arnold')
+        >>> ArnoldPath('MT_BG_co_AO/AO.001.exr').layer
+        u'AO'
         """
 
-        layers = self.layers
         if not self:
-            return
+            return None
 
-        for layer in layers:
-            match = re.search(r'\b({}\d*)\b'.format(layer),
-                              self.name)
-            if match:
-                return get_unicode(match.group(1))
+        layers = self.layers
+        return self._memoized(
+            '_layer_memo', (layers,),
+            lambda: layer_matcher(layers).match(self.name))
 
     @property
     def tag(self):
@@ -150,17 +521,13 @@ class PurePath(pathlib.PurePath):
 
         Use custom tag pattern:
 
-        >>> path = PurePath('Z:/MT/Render/image/MT_BG_co/MT_BG_co_Z/Z.001.exr')
-        >>> path.tag_partten = r'MT_(.+)_'
-        >>> path.tag
+        >>> class MTPath(PurePosixPath):
+        ...     tag_pattern = r'MT_(.+)_'
+        >>> MTPath('Z:/MT/Render/image/MT_BG_co/MT_BG_co_Z/Z.001.exr').tag
         u'BG'
-        >>> path = PurePath('MT_BG_co_Z')
-        >>> path.tag_partten = r'MT_(.+)_'
-        >>> path.tag
+        >>> MTPath('MT_BG_co_Z').tag
         u'BG'
-        >>> path = PurePath('Z.001.exr')
-        >>> path.tag_partten = r'MT_(.+)_'
-        >>> path.tag
+        >>> MTPath('Z.001.exr').tag
         u'Z'
 
         Use default tag pattern:
@@ -184,34 +551,10 @@ class PurePath(pathlib.PurePath):
         u'OCC_CH_B'
         """
 
-        pat = self.tag_pattern or TAG_PATTERN
-        ret = None
-        path = self
-
-        for testing_pat in (pat, TAG_PATTERN):
-            tag_pat = re.compile(testing_pat, flags=re.I)
-            for test_string in\
-                    (path.parent.name, path.name):
-                match = re.match(tag_pat, test_string)
-                if match and match.group(1):
-                    ret = match.group(1).strip('_').upper()
-                    if not is_regular_tag(ret):
-                        LOGGER.warning('不规范标签: %s: %s', ret, self)
-                    break
-            if ret:
-                break
-        else:
-            ret = self.default_tag
-
-        if TAG_CONVERT_DICT.has_key(ret):
-            ret = TAG_CONVERT_DICT[ret]
-        else:
-            ret = '_'.join(ret.split('_')[:2])
-            ret = TAG_CONVERT_DICT.get(ret, ret)
-
-        if ret.startswith(tuple(string.digits)):
-            ret = '_{}'.format(ret)
-        return get_unicode(ret)
+        key = (self.tag_resolver, self.tag_pattern, self.default_tag)
+        return self._memoized(
+            '_tag_memo', key,
+            lambda: key[0].resolve(self.parent.name, self.name, *key[1:]))
 
     @property
     def shot(self):
@@ -231,11 +574,7 @@ class PurePath(pathlib.PurePath):
         u'suv2005'
         """
 
-        match = re.match(self.version_pattern, self.name, flags=re.I)
-        if not match:
-            return get_unicode(self.stem)
-        shot = match.group(1)
-        return shot.strip('_')
+        return self._version_info()[0]
 
     @property
     def version(self):
@@ -253,10 +592,18 @@ class PurePath(pathlib.PurePath):
         2
         """
 
-        match = re.match(self.version_pattern, self.name, flags=re.I)
-        if not match:
-            return None
-        return int(match.group(2))
+        return self._version_info()[1]
+
+    def _version_info(self):
+        pattern = self.version_pattern
+
+        def _parse():
+            match = re.match(pattern, self.name, flags=re.I)
+            if not match:
+                return get_unicode(self.stem), None
+            return match.group(1).strip('_'), int(match.group(2))
+
+        return self._memoized('_version_memo', (pattern,), _parse)
 
     @property
     def footage_name(self):
@@ -272,12 +619,11 @@ class PurePath(pathlib.PurePath):
         u'sc_001._BG'
         """
 
-        ret = self.name
-        ret = re.sub(r'\.\d+\b', '', ret)
-        ret = re.sub(r'\.#+(?=\.)', '', ret)
-        ret = re.sub(r'\.%0?\d*d\b', '', ret)
-        ret = PurePath(ret).stem
-        return get_unicode(ret)
+        ret = getattr(self, '_footage_name', None)
+        if ret is None:
+            ret = get_unicode(_footage_name(self.name))
+            setattr(self, '_footage_name', ret)
+        return ret
 
     def with_frame(self, frame):
         '''Return a frame mark expaned version of filename, with given frame.
@@ -365,6 +711,54 @@ class Path(pathlib.Path, PurePath):
                        encoding, errors, newline)
 
 
+class PathPool(object):
+    """Interning pool for path objects.
+
+    Paths are weakly referenced,
+    only the most recently created @maxsize paths are kept alive.
+
+    Args:
+        maxsize (int, optional): Defaults to 4096.
+            Count of recently created paths to keep alive.
+    """
+
+    def __init__(self, maxsize=4096):
+        self._paths = weakref.WeakValueDictionary()
+        self._recent = deque(maxlen=maxsize)
+
+    def __len__(self):
+        return len(self._paths)
+
+    def get(self, cls, text):
+        """Get interned path.
+
+        Args:
+            cls (type): Path class.
+            text (six.text_type): Path text.
+
+        Returns:
+            PurePath: Path object, same for same normalized path.
+        """
+
+        key = (cls, text)
+        ret = self._paths.get(key)
+        if ret is None:
+            ret = cls.from_str(text)
+            ret = self._paths.setdefault((cls, six.text_type(ret)), ret)
+            self._paths[key] = ret
+            self._recent.append(ret)
+        return ret
+
+    def clear(self):
+        """Remove all interned paths.  """
+
+        self._paths.clear()
+        self._recent.clear()
+
+
+PATH_POOL = PathPool()
+
+
 class PosixPath(Path, PurePosixPath):
     """Port from pathlib.PosixPath.  """
 
@@ -381,3 +775,272 @@ class WindowsPath(Path, PureWindowsPath):
 
     def group(self):
         raise NotImplementedError("Path.group() is unsupported on this system")
+
+
+Footage = namedtuple(
+    'Footage',
+    ('shot', 'version', 'tag', 'layer', 'footage_name', 'frame', 'suffix'))
+
+
+# 64 bit on all platforms when available, `long` is 32 bit on Windows.
+_INT_TYPECODE = 'q' if six.PY3 else 'l'
+
+
+def _array_to_bytes(value):
+    if isinstance(value, list):
+        return value
+    return value.tobytes() if six.PY3 else value.tostring()
+
+
+def _array_from_bytes(value, data):
+    if isinstance(data, list):
+        value.extend(data)
+    elif six.PY3:
+        value.frombytes(data)
+    else:
+        value.fromstring(data)
+
+
+class FootageTable(object):
+    """Column store for many parsed footages.
+
+    Text columns are indexes into one shared string pool,
+    integer columns use -1 for missing value.
+    Integer column falls back to a list when a value does not fit in array,
+    e.g. a frame number with many digits.
+    """
+
+    text_columns = ('shot', 'tag', 'layer', 'footage_name', 'suffix')
+    int_columns = ('version', 'frame')
+
+    def __init__(self):
+        self.strings = []
+        self._string_index = {}
+        self._columns = {i: array(_INT_TYPECODE)
+                         for i in self.text_columns + self.int_columns}
+        self._update_appends()
+
+    def _update_appends(self):
+        self._appends = [(self._columns[i].append, i in self.text_columns, i)
+                         for i in Footage._fields]
+
+    def _widen(self, column):
+        self._columns[column] = list(self._columns[column])
+        self._update_appends()
+
+    def __getstate__(self):
+        # Bound methods and py2 `array` can not be pickled.
+        return {'strings': self.strings,
+                'columns': {k: _array_to_bytes(v) for k, v in self._columns.items()}}
+
+    def __setstate__(self, state):
+        self.__init__()
+        self.strings = state['strings']
+        self._string_index = {v: k for k, v in enumerate(self.strings)}
+        for k, v in state['columns'].items():
+            if isinstance(v, list):
+                self._widen(k)
+            _array_from_bytes(self._columns[k], v)
+
+    def __len__(self):
+        return len(self._columns['shot'])
+
+    def __getitem__(self, index):
+        return Footage(**{i: self._value(i, index) for i in Footage._fields})
+
+    def __iter__(self):
+        for i in six.moves.range(len(self)):
+            yield self[i]
+
+    def _value(self, column, index):
+        value = self._columns[column][index]
+        if value < 0:
+            return None
+        if column in self.text_columns:
+            return self.strings[value]
+        return value
+
+    def _intern(self, text):
+        ret = self._string_index.get(text)
+        if ret is None:
+            if text is None:
+                return -1
+            ret = self._string_index[text] = len(self.strings)
+            self.strings.append(text)
+        return ret
+
+    def column(self, name):
+        """Get all values of a column.
+
+        Args:
+            name (str): Column name, one of `Footage` fields.
+
+        Returns:
+            list: Column values.
+        """
+
+        values = self._columns[name]
+        if name in self.text_columns:
+            strings = self.strings
+            return [strings[i] if i >= 0 else None for i in values]
+        return [i if i >= 0 else None for i in values]
+
+    def append(self, footage):
+        """Append a row.
+
+        Args:
+            footage (Footage): Row to append.
+        """
+
+        intern = self._intern
+        for (append, is_text, column), value in zip(self._appends, footage):
+            if is_text:
+                value = intern(value)
+            elif value is None:
+                value = -1
+            try:
+                append(value)
+            except OverflowError:
+                self._widen(column)
+                self._columns[column].append(value)
+
+    def extend(self, other):
+        """Append all rows from @other table.
+
+        Args:
+            other (FootageTable): Table to append.
+        """
+
+        mapping = [self._intern(i) for i in other.strings]
+        for i in self.text_columns:
+            self._columns[i].extend(
+                array(_INT_TYPECODE, (mapping[j] if j >= 0 else -1
+                                      for j in other._columns[i])))  # pylint: disable=protected-access
+        for i in self.int_columns:
+            values = other._columns[i]  # pylint: disable=protected-access
+            if isinstance(values, list) and not isinstance(self._columns[i], list):
+                self._widen(i)
+            self._columns[i].extend(values)
+
+
+def version_parser(cls=None):
+    """Create a function that parses shot and version from file name.
+
+    >>> parse = version_parser()
+    >>> parse('sc_001_v2_BG.0034.exr')
+    (u'sc_001', 2)
+    >>> parse('thumbs.db')
+    (u'thumbs', None)
+
+    Args:
+        cls (type, optional): Defaults to None. `PurePath` subclass,
+            use its version pattern for parsing.
+
+    Returns:
+        function: Takes file name, returns (shot, version) tuple,
+            same as `PurePath.shot` and `PurePath.version`.
+    """
+
+    cls = cls or PurePath
+    match_version = re.compile(cls.version_pattern, flags=re.I).match
+
+    def _parse(name):
+        match = match_version(name)
+        if match:
+            return match.group(1).strip('_'), int(match.group(2))
+        return _split_suffix(name)[0], None
+
+    return _parse
+
+
+def footage_parser(cls=None):
+    """Create a function that parses footage fields from names.
+
+    >>> parse = footage_parser()
+    >>> parse('MT_BG_co', 'sc_001_v2_BG.0034.exr').version
+    2
+
+    Args:
+        cls (type, optional): Defaults to None. `PurePath` subclass,
+            use its patterns and layers for parsing.
+
+    Returns:
+        function: Takes parent directory name and file name,
+            returns a `Footage`.
+    """
+
+    cls = cls or PurePath
+    parse_version = version_parser(cls)
+    resolve_tag = cls.tag_resolver.resolve
+    match_layer = layer_matcher(cls.layers).match
+    tag_pattern, default_tag = cls.tag_pattern, cls.default_tag
+    find_frames = _FRAME_PATTERN.findall
+
+    def _parse(parent_name, name):
+        suffix = _split_suffix(name)[1]
+        shot, version = parse_version(name)
+        frames = find_frames(name)
+        return Footage(
+            shot=shot,
+            version=version,
+            tag=resolve_tag(parent_name, name, tag_pattern, default_tag),
+            layer=match_layer(name),
+            footage_name=_footage_name(name),
+            frame=int(frames[-1]) if frames else None,
+            suffix=suffix)
+
+    return _parse
+
+
+def _parse_footages(paths, cls):
+    ret = FootageTable()
+    parse = footage_parser(cls)
+    append = ret.append
+    for path in paths:
+        append(parse(*split_name(path)))
+    return ret
+
+
+def _parse_footages_chunk(args):
+    return _parse_footages(*args)
+
+
+def parse_footages(paths, cls=None, processes=None, chunksize=100000):
+    """Parse many footage paths in one pass.
+
+    >>> table = parse_footages(['MT_BG_co/sc_001_v2_BG.0034.exr'])
+    >>> table[0].shot, table[0].version, table[0].tag, table[0].frame
+    (u'sc_001', 2, u'BG', 34)
+
+    Args:
+        paths (iterable): Footage paths.
+        cls (type, optional): Defaults to None. `PurePath` subclass,
+            use its patterns and layers for parsing.
+        processes (int, optional): Defaults to None.
+            When given, split input to chunks and parse with process pool.
+        chunksize (int, optional): Defaults to 100000.
+            Paths count of each chunk for process pool.
+
+    Returns:
+        FootageTable: Parsed footages, in same order as @paths.
+    """
+
+    cls = cls or PurePath
+    if not processes or processes <= 1:
+        return _parse_footages(paths, cls)
+
+    paths = list(paths)
+    if len(paths) <= chunksize:
+        return _parse_footages(paths, cls)
+
+    ret = FootageTable()
+    pool = multiprocessing.Pool(processes)
+    try:
+        for i in pool.imap(_parse_footages_chunk,
+                           ((paths[i:i + chunksize], cls)
+                            for i in six.moves.range(0, len(paths), chunksize))):
+            ret.extend(i)
+    finally:
+        pool.close()
+        pool.join()
+    return ret
@@ -37,16 +37,23 @@ class BaseProgressHandler(object):
     def on_started(self):
         self.start_time = self.last_step_time = time.time()
 
-    def step(self, item=None):
-        """Progress one step forward.  """
+    def step(self, item=None, amount=1):
+        """Progress forward.
+
+        Args:
+            item (optional): Defaults to None. Current item, used for message.
+            amount (int, optional): Defaults to 1. Step size,
+                e.g. byte count of a finished chunk.
+        """
 
         if self.is_cancelled():
             raise CancelledError
         if not self.is_busy():
-            self.set_value(self.count * 100 / self.total)
+            if self.total:
+                self.set_value(self.count * 100 / self.total)
             self.set_message(self.message_factory(item))
             self.last_step_time = time.time()
-        self.count += 1
+        self.count += amount
 
     def set_value(self, value):
         """Set progress value.  """
@@ -42,6 +42,8 @@ class CLIProgressHandler(BaseProgressHandler):
         self.last_printed_len = msg_len
 
     def message_factory(self, item):
+        if not self.total:
+            return '[{}]{}'.format(self.count, item)
         return '[{}/{}]{}%{}'.format(self.count, self.total, self.count * 100 / self.total, item)
 
 
@@ -79,13 +79,14 @@ class QtProgressHandler(BaseProgressHandler):
     def is_cancelled(self):
         return self.progress_bar.isCancelled()
 
-    def step(self, item=None):
-        super(QtProgressHandler, self).step(item)
+    def step(self, item=None, amount=1):
+        super(QtProgressHandler, self).step(item, amount)
         QtWidgets.QApplication.processEvents()
 
     def message_factory(self, item):
 
-        ret = '[{}/{}]'.format(self.count, self.total)
+        ret = ('[{}/{}]'.format(self.count, self.total) if self.total
+               else '[{}]'.format(self.count))
         if item is not None:
             ret += u(item)
 
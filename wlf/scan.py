@@ -0,0 +1,122 @@
+# -*- coding=UTF-8 -*-
+"""Scan render trees with parallel directory listing.  """
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import logging
+import multiprocessing.dummy
+import os
+from collections import namedtuple
+
+import six
+from six.moves import queue
+
+from .codectools import get_unicode as u
+from .concurrency import AIMDController
+from .path import footage_parser
+
+LOGGER = logging.getLogger('com.wlf.scan')
+
+FootageRecord = namedtuple(
+    'FootageRecord', ('path', 'size', 'mtime', 'shot', 'version', 'tag'))
+
+
+def list_dir(path, parse):
+    """List one directory to footage records.
+
+    Files can not stat are logged and skipped.
+
+    Args:
+        path (six.text_type): Directory path.
+        parse (callable): Return value of `wlf.path.footage_parser`.
+
+    Raises:
+        OSError: Can not list directory.
+
+    Returns:
+        tuple: (`FootageRecord` list for files, sub directory path list)
+    """
+
+    records, dirs = [], []
+    parent_name = os.path.basename(path)
+    for entry in os.scandir(path):
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                dirs.append(entry.path)
+            elif entry.is_file():
+                stat = entry.stat()
+                footage = parse(parent_name, entry.name)
+                records.append(FootageRecord(
+                    entry.path, stat.st_size, stat.st_mtime,
+                    footage.shot, footage.version, footage.tag))
+        except OSError as ex:
+            LOGGER.warning('Can not stat: %s: %s', entry.path, ex)
+    return records, dirs
+
+
+def _scan_dir(path, parse, controller):
+    try:
+        # Errors pass through slot, so congestion shrinks the limit.
+        with controller.slot():
+            return list_dir(path, parse)
+    except OSError as ex:
+        LOGGER.warning('Can not list directory: %s: %s', path, ex)
+    except Exception:  # pylint: disable=broad-except
+        # Caller waits for every directory, so never raise here.
+        LOGGER.error('Error during scan: %s', path, exc_info=True)
+    return [], []
+
+
+def scan(roots, workers=8, cls=None, controller=None):
+    """Walk @roots and yield footage records as soon as listed.
+
+    Each directory is listed by one task in a thread pool,
+    file size and mtime are read once during listing,
+    so records can replace per-file `stat` calls of later steps:
+
+    >>> from wlf import fileutil, sequence
+    >>> records = list(scan('Z:/EP01/Render'))  # doctest: +SKIP
+    >>> sequence.collapse(i.path for i in records)  # doctest: +SKIP
+    >>> fileutil.checked_exists(paths, records=records)  # doctest: +SKIP
+    >>> fileutil.version_filter(records, records=True)  # doctest: +SKIP
+
+    Args:
+        roots (path or iterable): Root directories.
+        workers (int, optional): Defaults to 8. Max directories
+            listed at same time.
+        cls (type, optional): Defaults to None. `PurePath` subclass,
+            use its patterns for parsing.
+        controller (AIMDController, optional): Defaults to None.
+            Adjust directories listed at same time by measured latency,
+            a new one with @workers as maximum when not given.
+
+    Returns:
+        generator: `FootageRecord` for every file, order is not stable.
+    """
+
+    if isinstance(roots, (six.text_type, six.binary_type)) or not hasattr(roots, '__iter__'):
+        roots = (roots,)
+    parse = footage_parser(cls)
+    controller = controller or AIMDController(maximum=workers)
+    results = queue.Queue()
+    pool = multiprocessing.dummy.Pool(controller.maximum)
+    pending = 0
+
+    def _submit(path):
+        pool.apply_async(_scan_dir, (path, parse, controller), callback=results.put)
+
+    try:
+        for i in roots:
+            _submit(u(i))
+            pending += 1
+        while pending:
+            records, dirs = results.get()
+            pending -= 1
+            for i in dirs:
+                _submit(i)
+                pending += 1
+            for i in records:
+                yield i
+    finally:
+        pool.terminate()
@@ -0,0 +1,182 @@
+# -*- coding=UTF-8 -*-
+"""Frame sequence collapsing and expanding.  """
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import os
+import re
+
+import six
+
+from .codectools import get_unicode as u
+from .frameset import FrameSet
+
+_FRAME_PATTERN = re.compile(r'\.(\d+)\b')
+_FRAME_MARK_PATTERN = re.compile(r'(#+|%0?\d*d)')
+
+
+class Sequence(object):
+    """Files that only differ by frame number.
+
+    Args:
+        head (six.text_type): Text before frame number.
+        tail (six.text_type): Text after frame number.
+        padding (int): Frame number width, 0 for file without frame.
+        frames (iterable): Frame numbers or `FrameSet`.
+    """
+
+    def __init__(self, head, tail, padding, frames):
+        self.head = head
+        self.tail = tail
+        self.padding = padding
+        self.frames = frames if isinstance(
+            frames, FrameSet) else FrameSet(frames)
+
+    def __repr__(self):
+        return 'Sequence({!r}, {!r}, {!r}, {})'.format(
+            self.pattern, self.first, self.last, len(self))
+
+    def __len__(self):
+        return len(self.frames) if self.padding else 1
+
+    def __iter__(self):
+        if not self.padding:
+            return iter((self.head + self.tail,))
+        return expand(self.pattern, self.frames)
+
+    @property
+    def pattern(self):
+        """Filename pattern with `#` as frame mark.
+
+        >>> Sequence('sc_001_BG.', '.exr', 4, [1, 2]).pattern
+        u'sc_001_BG.####.exr'
+        """
+
+        return self.head + '#' * self.padding + self.tail
+
+    @property
+    def first(self):
+        """First frame, None for file without frame.  """
+
+        return self.frames.first
+
+    @property
+    def last(self):
+        """Last frame, None for file without frame.  """
+
+        return self.frames.last
+
+    def missing(self):
+        """Frames missing between first and last frame.
+
+        >>> Sequence('sc_001_BG.', '.exr', 4, [1, 2, 5, 7]).missing()
+        FrameSet(u'3-4,6')
+
+        Returns:
+            FrameSet: Missing frame numbers.
+        """
+
+        return self.frames.gaps()
+
+
+def _frame_formatter(pattern):
+    parts = _FRAME_MARK_PATTERN.split(u(pattern))
+    for index, part in enumerate(parts):
+        if index % 2:
+            if part.startswith('#'):
+                part = '{{0:0{}d}}'.format(len(part))
+            else:
+                part = '{{0:{}d}}'.format(part[1:-1])
+        else:
+            part = part.replace('{', '{{').replace('}', '}}')
+        parts[index] = part
+    return ''.join(parts).format
+
+
+def expand(pattern, frames):
+    """Lazily generate filenames for @pattern with @frames.
+
+    `#` and printf style frame marks in pattern are supported,
+    same as `PurePath.with_frame`.
+    @frames can be a frame ranges text parsed by `FrameSet.parse`.
+
+    >>> list(expand('sc_001_BG.####.exr', [1, 2]))
+    [u'sc_001_BG.0001.exr', u'sc_001_BG.0002.exr']
+    >>> list(expand('sc_001_BG.%03d.exr', '9-10'))
+    [u'sc_001_BG.009.exr', u'sc_001_BG.010.exr']
+
+    Args:
+        pattern (six.text_type): Filename pattern.
+        frames (iterable or six.text_type): Frame numbers or frame ranges.
+
+    Returns:
+        generator: Filenames.
+    """
+
+    if isinstance(frames, six.string_types):
+        frames = FrameSet.parse(frames)
+    formatter = _frame_formatter(pattern)
+    for frame in frames:
+        yield formatter(frame)
+
+
+def _split_frame(path):
+    start = max(path.rfind('/'), path.rfind(os.sep)) + 1
+    match = None
+    for match in _FRAME_PATTERN.finditer(path, start):
+        pass
+    if match is None:
+        return path, None, ''
+    return path[:match.start(1)], match.group(1), path[match.end(1):]
+
+
+def collapse(paths):
+    """Collapse file paths to sequences in one pass.
+
+    Frame numbers are buffered for each sequence,
+    then sorted and merged into a `FrameSet` once.
+
+    >>> collapse(['a.0001.exr', 'a.0003.exr', 'a.0002.exr', 'b.exr'])
+    [Sequence(u'a.####.exr', 1, 3, 3), Sequence(u'b.exr', None, None, 1)]
+
+    Args:
+        paths (iterable): File paths.
+
+    Returns:
+        list: `Sequence` objects sorted by pattern.
+    """
+
+    groups = {}
+    singles = set()
+    for path in paths:
+        if not isinstance(path, six.text_type):
+            path = u(path)
+        head, digits, tail = _split_frame(path)
+        if digits is None:
+            singles.add(path)
+            continue
+        # Unpadded frame number can have any padding not longer than it.
+        width = len(digits) if digits.startswith('0') and len(digits) > 1 else 0
+        key = (head, tail, width)
+        groups.setdefault(key, []).append(int(digits))
+
+    ret = [Sequence(i, '', 0, ()) for i in singles]
+    padded_widths = {}
+    for head, tail, width in groups:
+        if width:
+            padded_widths.setdefault((head, tail), set()).add(width)
+    for (head, tail, width), frames in six.iteritems(groups):
+        if width:
+            continue
+        padding = len(six.text_type(min(frames)))
+        widths = padded_widths.get((head, tail), ())
+        if len(widths) == 1 and padding >= min(widths):
+            groups[(head, tail, min(widths))].extend(frames)
+        else:
+            ret.append(Sequence(head, tail, padding, FrameSet(frames)))
+    ret.extend(Sequence(head, tail, width, FrameSet(frames))
+               for (head, tail, width), frames in six.iteritems(groups)
+               if width)
+    ret.sort(key=lambda x: (x.pattern, x.padding))
+    return ret